@@ -2,15 +2,22 @@
 FastAPI wrapper for YouTube scraper
 """
 
-from fastapi import FastAPI, HTTPException, Query, Header
+from fastapi import FastAPI, HTTPException, Query, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, RedirectResponse, HTMLResponse
+from fastapi.responses import StreamingResponse, RedirectResponse, HTMLResponse, PlainTextResponse
 import httpx
+import asyncio
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
 from html_ui import HTML_CONTENT
 
-from scraper import extract_streams, get_best_audio, get_best_video, get_audio_by_quality
+import metrics
+import scraper
+from scraper import extract_streams, get_best_audio, get_best_video, get_audio_by_quality, select_audio
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
@@ -30,32 +37,123 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ── Extraction worker pool ────────────────────────────────────────────────────
+# yt-dlp blocks, so it runs on a bounded thread pool; the event loop only does
+# I/O. Each route also has its own concurrency limit so e.g. a burst of /extract
+# calls cannot starve /stream.
+executor = ThreadPoolExecutor(max_workers=int(os.environ.get("SCRAPER_WORKERS", "8")))
+
+ROUTE_LIMITS = {"extract": 2, "audio": 4, "video": 2, "stream": 6}
+ROUTE_QUEUE_TIMEOUT = 20  # seconds to wait for a route slot before answering 503
+
+_route_slots = {route: asyncio.Semaphore(n) for route, n in ROUTE_LIMITS.items()}
+
+ROUTE_WAIT = metrics.Histogram("scraper_route_wait_seconds", "Time spent waiting for a route slot", ("route",))
+ROUTE_REJECTED = metrics.Counter("scraper_route_rejected_total", "Requests answered 503 for lack of a route slot", ("route",))
+PROXY_ACTIVE = metrics.Gauge("scraper_proxy_streams_active", "Proxy streams currently open")
+PROXY_BYTES = metrics.Counter("scraper_proxy_bytes_total", "Bytes proxied to clients")
+UPSTREAM_STATUS = metrics.Counter("scraper_upstream_responses_total", "googlevideo responses by status", ("status",))
+metrics.Gauge("scraper_executor_queue_depth", "Jobs waiting for an executor thread", fn=lambda: executor._work_queue.qsize())
+
+
+async def run_blocking(route: str, fn, *args):
+    """Run a blocking extraction call on the pool, within the route's concurrency limit."""
+    slots = _route_slots[route]
+    t0 = time.perf_counter()
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout=ROUTE_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        ROUTE_REJECTED.inc(route)
+        raise HTTPException(status_code=503, detail=f"Too many concurrent {route} requests, retry shortly")
+    ROUTE_WAIT.observe(time.perf_counter() - t0, route)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+    finally:
+        slots.release()
+
+
+@app.on_event("startup")
+async def _warm_extract_pool():
+    if scraper._extract_pool:
+        asyncio.get_running_loop().run_in_executor(executor, scraper._extract_pool.warm)
+
+
+@app.on_event("startup")
+async def _warm_scraper():
+    # Uvicorn binds the port only after startup hooks return, so this is not awaited
+    if os.environ.get("SCRAPER_WARM_UP", "1") != "0":
+        asyncio.get_running_loop().run_in_executor(executor, scraper.warm)
+
+
 @app.get("/")
 def root():
     return HTMLResponse(content=HTML_CONTENT)
 
+@app.get("/metrics")
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/memory")
+def get_memory():
+    """Approximate bytes held by the stream cache; walks every entry."""
+    caches = scraper.cache_usage()
+    return {"caches": caches, "total_bytes": sum(row["bytes"] for row in caches.values())}
+
 @app.get("/health")
 def health():
     return {"status": "healthy"}
 
 @app.get("/extract/{video_id}")
-def extract(video_id: str):
+async def extract(video_id: str):
     """
     Extract all audio and video streams for a video
     Returns JSON with stream URLs and metadata
     """
     try:
-        result = extract_streams(video_id)
+        result = await run_blocking("extract", extract_streams, video_id)
         return {
             "success": True,
             "data": result
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Extract error for {video_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+BATCH_MAX = 10
+
+@app.get("/audio/batch")
+async def audio_batch(
+    ids: str = Query(..., description="Comma-separated video IDs (max 10)"),
+    quality: str = Query("high", description="Audio quality: high or low"),
+):
+    """
+    Best audio stream URL for several videos in one round trip.
+    IDs resolve concurrently within the audio route limit; a failed ID maps to
+    null in data, with the reason in errors.
+    """
+    video_ids = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if not video_ids or len(video_ids) > BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"Pass 1-{BATCH_MAX} comma-separated video IDs")
+
+    results = await asyncio.gather(
+        *(run_blocking("audio", select_audio, v, quality) for v in video_ids), return_exceptions=True
+    )
+    data, errors = {}, {}
+    for video_id, result in zip(video_ids, results):
+        data[video_id] = result if isinstance(result, dict) else None
+        if isinstance(result, HTTPException):
+            errors[video_id] = result.detail
+        elif isinstance(result, Exception):
+            logger.error(f"Audio error for {video_id}: {result}")
+            errors[video_id] = str(result)
+        elif not result:
+            errors[video_id] = "No audio stream found"
+    return {"success": True, "data": data, "errors": errors}
+
 @app.get("/audio/{video_id}")
-def audio(
+async def audio(
     video_id: str,
     quality: str = Query("high", description="Audio quality: high or low"),
     redirect: bool = Query(False, description="Redirect to direct URL")
@@ -64,7 +162,7 @@ def audio(
     Get best audio stream URL
     """
     try:
-        stream = get_audio_by_quality(video_id, quality)
+        stream = await run_blocking("audio", get_audio_by_quality, video_id, quality)
         if not stream:
             raise HTTPException(status_code=404, detail="No audio stream found")
 
@@ -82,7 +180,7 @@ def audio(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/video/{video_id}")
-def video(
+async def video(
     video_id: str,
     max_quality: str = Query("1080p", description="Max video quality"),
     redirect: bool = Query(False, description="Redirect to direct URL")
@@ -91,7 +189,7 @@ def video(
     Get best video stream URL
     """
     try:
-        stream = get_best_video(video_id, max_quality)
+        stream = await run_blocking("video", get_best_video, video_id, max_quality)
         if not stream:
             raise HTTPException(status_code=404, detail="No video stream found")
 
@@ -108,56 +206,178 @@ def video(
         logger.error(f"Video error for {video_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# ── /stream helpers ───────────────────────────────────────────────────────────
+_UPSTREAM_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "*/*",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "identity",
+    "Referer": "https://www.youtube.com/",
+}
+
+_CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, HEAD, OPTIONS",
+    "Access-Control-Allow-Headers": "*",
+    "Access-Control-Expose-Headers": "Content-Length, Content-Range, Accept-Ranges, ETag",
+}
+
+_upstream_client = None
+
+
+def _get_upstream_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for googlevideo."""
+    global _upstream_client
+    if _upstream_client is None:
+        _upstream_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            follow_redirects=True,
+        )
+    return _upstream_client
+
+
+def _stream_size(stream_data: dict) -> Optional[int]:
+    """Byte length from the cached format metadata, else the URL's clen param."""
+    if stream_data.get("size"):
+        return int(stream_data["size"])
+    clen = parse_qs(urlparse(stream_data["url"]).query).get("clen")
+    return int(clen[0]) if clen and clen[0].isdigit() else None
+
+
+def _stream_etag(video_id: str, stream_data: dict) -> str:
+    return f'"{video_id}-{stream_data.get("itag", "")}-{_stream_size(stream_data) or 0}"'
+
+
+def _parse_range(range_header: str, size: int):
+    """Single `bytes=` range → (start, end) inclusive; None if unsatisfiable."""
+    try:
+        unit, spec = range_header.split("=", 1)
+        if unit.strip() != "bytes" or "," in spec:
+            return None
+        first, last = spec.strip().split("-", 1)
+        if first:
+            start, end = int(first), int(last) if last else size - 1
+        else:
+            start, end = max(0, size - int(last)), size - 1
+    except ValueError:
+        return None
+    end = min(end, size - 1)
+    return (start, end) if 0 <= start <= end else None
+
+
+def _effective_range(range_header: Optional[str], if_range: Optional[str], etag: str) -> Optional[str]:
+    # If-Range: only honour the Range when the client's validator still matches
+    if range_header and if_range and if_range.strip() != etag:
+        return None
+    return range_header
+
+
+@app.options("/stream/{video_id}")
+async def stream_options(video_id: str):
+    return Response(status_code=204, headers={**_CORS_HEADERS, "Allow": "GET, HEAD, OPTIONS"})
+
+
+@app.head("/stream/{video_id}")
+async def stream_head(
+    video_id: str,
+    quality: str = Query("high", description="Audio quality"),
+    range: str = Header(None, alias="range"),
+    if_range: str = Header(None, alias="if-range"),
+):
+    """
+    Answers seek/length probes from cached format metadata — no upstream fetch.
+    """
+    stream_data = await run_blocking("stream", get_audio_by_quality, video_id, quality)
+    if not stream_data:
+        raise HTTPException(status_code=404, detail="No audio stream found")
+
+    etag = _stream_etag(video_id, stream_data)
+    headers = {
+        **_CORS_HEADERS,
+        "Accept-Ranges": "bytes",
+        "Content-Type": stream_data.get("mimeType", "audio/mp4"),
+        "Cache-Control": "no-cache",
+        "ETag": etag,
+    }
+    size = _stream_size(stream_data)
+    if size is None:
+        return Response(status_code=200, headers=headers)
+
+    range_header = _effective_range(range, if_range, etag)
+    if not range_header:
+        headers["Content-Length"] = str(size)
+        return Response(status_code=200, headers=headers)
+
+    byte_range = _parse_range(range_header, size)
+    if byte_range is None:
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return Response(status_code=206, headers=headers)
+
+
 @app.get("/stream/{video_id}")
 async def stream(
     video_id: str,
     quality: str = Query("high", description="Audio quality"),
-    range: str = Header(None, alias="range")
+    range: str = Header(None, alias="range"),
+    if_range: str = Header(None, alias="if-range"),
 ):
     """
     Proxy stream audio (for CORS compatibility)
-    Supports HTTP Range requests for seeking
+    Supports HTTP Range requests for seeking; upstream Content-Length /
+    Content-Range are forwarded so browsers can compute seek offsets.
     """
     try:
-        stream_data = get_audio_by_quality(video_id, quality)
+        stream_data = await run_blocking("stream", get_audio_by_quality, video_id, quality)
         if not stream_data:
             raise HTTPException(status_code=404, detail="No audio stream found")
 
         url = stream_data["url"]
         mime_type = stream_data.get("mimeType", "audio/mp4")
+        etag = _stream_etag(video_id, stream_data)
 
         # Headers for the request to YouTube
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept": "*/*",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "identity",
-            "Referer": "https://www.youtube.com/",
-        }
+        headers = dict(_UPSTREAM_HEADERS)
+        range_header = _effective_range(range, if_range, etag)
+        if range_header:
+            headers["Range"] = range_header
 
-        if range:
-            headers["Range"] = range
-
-        async def proxy_generator():
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                async with client.stream("GET", url, headers=headers, follow_redirects=True) as response:
-                    async for chunk in response.aiter_bytes(chunk_size=65536):
-                        yield chunk
+        client = _get_upstream_client()
+        upstream = await client.send(client.build_request("GET", url, headers=headers), stream=True)
+        UPSTREAM_STATUS.inc(upstream.status_code)
+        if upstream.status_code >= 400:
+            await upstream.aclose()
+            raise HTTPException(status_code=502, detail=f"Upstream returned {upstream.status_code}")
 
         response_headers = {
+            **_CORS_HEADERS,
             "Accept-Ranges": "bytes",
             "Content-Type": mime_type,
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "GET, OPTIONS",
-            "Access-Control-Allow-Headers": "*",
             "Cache-Control": "no-cache",
+            "ETag": etag,
         }
+        for h in ("Content-Length", "Content-Range"):
+            value = upstream.headers.get(h)
+            if value:
+                response_headers[h] = value
 
-        status_code = 206 if range else 200
+        async def proxy_generator():
+            PROXY_ACTIVE.inc()
+            try:
+                async for chunk in upstream.aiter_bytes(chunk_size=65536):
+                    PROXY_BYTES.inc(amount=len(chunk))
+                    yield chunk
+            finally:
+                PROXY_ACTIVE.dec()
+                await upstream.aclose()
 
         return StreamingResponse(
             proxy_generator(),
-            status_code=status_code,
+            status_code=upstream.status_code,
             media_type=mime_type,
             headers=response_headers
         )
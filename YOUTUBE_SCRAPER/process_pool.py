@@ -0,0 +1,98 @@
+"""
+Optional process-pool backend for CPU-heavy extraction (yt-dlp / pytubefix).
+
+JSON parsing, nsig JS interpretation and regex work hold the GIL; running them
+in worker processes keeps the asyncio proxy loop responsive. Workers are
+spawned and warmed up front, every job has a timeout, and a hung or crashed
+worker only fails its job: the pool is torn down and rebuilt on next use.
+
+Enabled with GROOVIA_EXTRACT_PROCESSES=<n> (0/unset = in-process, the default);
+GROOVIA_EXTRACT_TIMEOUT sets the per-job limit in seconds.
+YTMUSIC_POC has an identical copy; the two services deploy separately.
+"""
+
+import concurrent.futures
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+_MAX_TASKS_PER_CHILD = 200  # recycle workers now and then to bound slow leaks
+
+
+def _warm(modules: tuple) -> None:
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Worker warm-up import of {name} failed: {e}")
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class ExtractionPool:
+    def __init__(self, workers: int, timeout: float, warm_modules: tuple = ()):
+        self.workers = workers
+        self.timeout = timeout
+        self.warm_modules = warm_modules
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _ensure(self) -> concurrent.futures.ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm,
+                    initargs=(self.warm_modules,),
+                    max_tasks_per_child=_MAX_TASKS_PER_CHILD,
+                )
+                logger.info(f"⚙️  Extraction process pool started ({self.workers} workers)")
+            return self._pool
+
+    def warm(self) -> None:
+        """Start every worker (and its imports) now rather than on the first request."""
+        pool = self._ensure()
+        for future in [pool.submit(_ping) for _ in range(self.workers)]:
+            future.result(timeout=120)
+
+    def run(self, fn, *args):
+        """Run fn(*args) in a worker process; raises on timeout or worker crash."""
+        pool = self._ensure()
+        future = pool.submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except concurrent.futures.TimeoutError:
+            logger.error(f"⏱️ Extraction job {fn.__name__}{args} exceeded {self.timeout}s — recycling pool")
+            self._reset(pool, kill=True)
+            raise TimeoutError(f"extraction exceeded {self.timeout}s")
+        except BrokenProcessPool:
+            logger.error(f"💥 Extraction worker crashed during {fn.__name__}{args} — recycling pool")
+            self._reset(pool)
+            raise RuntimeError("extraction worker crashed")
+
+    def _reset(self, pool, kill: bool = False) -> None:
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        if kill:
+            # A hung job cannot be cancelled inside ProcessPoolExecutor; stop its workers.
+            # Other jobs in flight on this pool fail with BrokenProcessPool.
+            for proc in list(getattr(pool, "_processes", {}).values()):
+                proc.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def from_env(warm_modules: tuple = ()):
+    workers = int(os.environ.get("GROOVIA_EXTRACT_PROCESSES", "0"))
+    if workers <= 0:
+        return None
+    timeout = float(os.environ.get("GROOVIA_EXTRACT_TIMEOUT", "40"))
+    return ExtractionPool(workers, timeout, warm_modules)
@@ -5,19 +5,34 @@ Works on Vercel Python — no Node.js / Deno required.
 Requires valid YouTube cookies via YT_COOKIES_B64 env var (same as YTMUSIC_POC).
 """
 
-import yt_dlp
 import logging
 import time
 import os
 import base64
+import queue
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from typing import Dict, Optional
 
+import metrics
+import process_pool
+
 logger = logging.getLogger(__name__)
 
 # ── In-memory URL cache (~50 min TTL) ────────────────────────────────────────
-_stream_cache: Dict[str, dict] = {}
+_stream_cache: Dict[str, "_CachedStreams"] = {}
 _CACHE_TTL = 3000  # seconds (50 min)
 
+# ── Metrics (rendered by api.py at /metrics) ─────────────────────────────────
+CACHE_REQUESTS = metrics.Counter("scraper_cache_requests_total", "Stream cache lookups", ("namespace", "result"))
+CACHE_EVICTIONS = metrics.Counter("scraper_cache_evictions_total", "Expired stream cache entries dropped", ("namespace",))
+EXTRACT_SECONDS = metrics.Histogram(
+    "scraper_extract_seconds", "yt-dlp extraction latency per host and player clients", ("host", "clients", "outcome")
+)
+
 # ── Cookies setup (same pattern as YTMUSIC_POC/server.py) ────────────────────
 _COOKIES_PATH = "/tmp/yt_cookies.txt"
 
@@ -46,10 +61,25 @@ def _setup_cookies() -> Optional[str]:
     return None
 
 
-_COOKIES_FILE = _setup_cookies()
+# Resolved on first use rather than at import, so a cold start doesn't pay for it
+_cookies_file: Optional[str] = None
+_cookies_resolved = False
+_cookies_lock = threading.Lock()
+
+
+def _cookies_path() -> Optional[str]:
+    global _cookies_file, _cookies_resolved
+    if not _cookies_resolved:
+        with _cookies_lock:
+            if not _cookies_resolved:
+                _cookies_file = _setup_cookies()
+                _cookies_resolved = True
+    return _cookies_file
 
 
-def _build_ydl_opts(fmt: str = "bestaudio/best") -> dict:
+def _build_ydl_opts(
+    fmt: str = "bestaudio/best", player_clients: tuple = ("android", "ios"), audio_only: bool = False
+) -> dict:
     opts = {
         "quiet": True,
         "no_warnings": True,
@@ -58,70 +88,346 @@ def _build_ydl_opts(fmt: str = "bestaudio/best") -> dict:
         "format": fmt,
         "extractor_args": {
             "youtube": {
-                "player_client": ["android", "ios"]
+                "player_client": list(player_clients)
             }
         }
     }
-    if _COOKIES_FILE and os.path.exists(_COOKIES_FILE):
-        opts["cookiefile"] = _COOKIES_FILE
+    if audio_only:
+        # Adaptive audio comes from streamingData; the HLS/DASH manifests only add video
+        opts["extractor_args"]["youtube"]["skip"] = ["hls", "dash"]
+    cookies_file = _cookies_path()
+    if cookies_file and os.path.exists(cookies_file):
+        opts["cookiefile"] = cookies_file
     return opts
 
 
+# ── YoutubeDL pool ────────────────────────────────────────────────────────────
+# Building a YoutubeDL re-initialises extractors, the cookie jar and the HTTP
+# opener, so instances are kept per option set and checked out one caller at a
+# time. Pools are rebuilt when the cookie file changes on disk.
+_YDL_POOL_SIZE = int(os.environ.get("YDL_POOL_SIZE", "4"))
+_ydl_pools: Dict[tuple, "queue.LifoQueue"] = {}
+_ydl_pool_lock = threading.Lock()
+
+
+def _cookie_stamp() -> Optional[float]:
+    try:
+        cookies_file = _cookies_path()
+        return os.path.getmtime(cookies_file) if cookies_file else None
+    except OSError:
+        return None
+
+
+def _discard_ydl(ydl) -> None:
+    # Don't write the in-memory jar back over a cookie file that may be newer
+    ydl.params["cookiefile"] = None
+    try:
+        ydl.close()
+    except Exception:
+        pass
+
+
+@contextmanager
+def _pooled_ydl(
+    fmt: str = "bestaudio/best", player_clients: tuple = ("android", "ios"), audio_only: bool = False
+):
+    """Check out a long-lived YoutubeDL for this option set."""
+    options_key = (fmt, tuple(player_clients), audio_only)
+    key = (*options_key, _cookie_stamp())
+    with _ydl_pool_lock:
+        pool = _ydl_pools.get(key)
+        if pool is None:
+            for stale_key in [k for k in _ydl_pools if k[:3] == options_key]:
+                stale = _ydl_pools.pop(stale_key)
+                while not stale.empty():
+                    _discard_ydl(stale.get_nowait())
+                logger.info("🍪 Cookie file changed — rebuilding yt-dlp pool")
+            pool = _ydl_pools[key] = queue.LifoQueue()
+
+    try:
+        ydl = pool.get_nowait()
+    except queue.Empty:
+        import yt_dlp  # deferred: ~150 ms of import time
+
+        ydl = yt_dlp.YoutubeDL(_build_ydl_opts(fmt, player_clients, audio_only))
+
+    try:
+        yield ydl
+    finally:
+        with _ydl_pool_lock:
+            keep = _ydl_pools.get(key) is pool and pool.qsize() < _YDL_POOL_SIZE
+        if keep:
+            pool.put(ydl)
+        else:
+            _discard_ydl(ydl)
+
+
+def warm() -> None:
+    """Resolve cookies and build the first pooled YoutubeDL ahead of the first request."""
+    start = time.perf_counter()
+    try:
+        clients = _attempt_paths()[0][1]
+        for audio_only in (False, True):
+            with _pooled_ydl(player_clients=clients, audio_only=audio_only):
+                pass
+    except Exception as e:
+        logger.warning(f"Warm-up incomplete: {e}")
+    logger.info(f"🔥 Warm-up done in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
 # ── Cache helpers ─────────────────────────────────────────────────────────────
-def _get_cached(video_id: str) -> Optional[dict]:
+# Entries are stored packed: streams become tuples in a fixed field order, URLs
+# are bytes and the small repeated strings (codec, mimeType, itag…) are interned.
+# They are unpacked into fresh dicts on every hit.
+_AUDIO_FIELDS = ("url", "bitrate", "codec", "mimeType", "quality", "itag", "size")
+_VIDEO_FIELDS = ("url", "quality", "fps", "mimeType", "type", "itag", "size")
+
+
+def _pack_value(field: str, value):
+    if field == "url":
+        return value.encode()
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _pack_streams(streams: list, fields: tuple) -> tuple:
+    return tuple(tuple(_pack_value(f, s.get(f)) for f in fields) for s in streams)
+
+
+def _unpack_streams(packed: tuple, fields: tuple) -> list:
+    return [{f: v.decode() if f == "url" else v for f, v in zip(fields, row)} for row in packed]
+
+
+class _CachedStreams:
+    __slots__ = ("video_id", "title", "thumbnail", "duration", "audio", "video", "expires_at")
+
+    def __init__(self, data: dict, expires_at: float):
+        self.video_id = data["videoId"]
+        self.title = data["title"]
+        self.thumbnail = data["thumbnail"]
+        self.duration = data["duration"]
+        self.audio = _pack_streams(data["audio_streams"], _AUDIO_FIELDS)
+        # None for audio-only records, which carry no video_streams key at all
+        self.video = _pack_streams(data["video_streams"], _VIDEO_FIELDS) if "video_streams" in data else None
+        self.expires_at = expires_at
+
+    def unpack(self) -> dict:
+        data = {
+            "videoId": self.video_id,
+            "title": self.title,
+            "thumbnail": self.thumbnail,
+            "duration": self.duration,
+            "audio_streams": _unpack_streams(self.audio, _AUDIO_FIELDS),
+        }
+        if self.video is not None:
+            data["video_streams"] = _unpack_streams(self.video, _VIDEO_FIELDS)
+        return data
+
+
+def _namespace(key: str) -> str:
+    return "audio" if key.startswith("audio:") else "stream"
+
+
+def _get_cached(video_id: str, count: bool = True) -> Optional[dict]:
     entry = _stream_cache.get(video_id)
-    if entry and entry.get("expires_at", 0) > time.time():
+    namespace = _namespace(video_id)
+    if entry and entry.expires_at > time.time():
         logger.info(f"🗄️  Cache hit: {video_id}")
-        return entry["data"]
+        if count:
+            CACHE_REQUESTS.inc(namespace, "hit")
+        return entry.unpack()
+    if entry and _stream_cache.pop(video_id, None) is not None:
+        CACHE_EVICTIONS.inc(namespace)
+    if count:
+        CACHE_REQUESTS.inc(namespace, "miss")
     return None
 
 
-def _set_cache(video_id: str, data: dict) -> None:
-    _stream_cache[video_id] = {
-        "data": data,
-        "expires_at": time.time() + _CACHE_TTL,
-    }
+_SWEEP_EVERY = 200
+_writes = 0
 
 
-# ── Core extractor ─────────────────────────────────────────────────────────────
-def extract_streams(video_id: str) -> dict:
-    """
-    Extract all audio and video streams for a YouTube video using yt-dlp.
-    Returns dict with audio_streams and video_streams lists.
-    """
-    cached = _get_cached(video_id)
-    if cached:
-        return cached
+def _set_cache(video_id: str, data: dict) -> None:
+    global _writes
+    _stream_cache[video_id] = _CachedStreams(data, time.time() + _CACHE_TTL)
+    _writes += 1
+    if _writes % _SWEEP_EVERY == 0:
+        _sweep_expired()
+
+
+def _sweep_expired() -> None:
+    """Drop expired entries that are never read again, so they are counted as evictions."""
+    now = time.time()
+    for key, entry in list(_stream_cache.items()):
+        if entry.expires_at <= now and _stream_cache.pop(key, None) is not None:
+            CACHE_EVICTIONS.inc(_namespace(key))
+
+
+def cache_usage() -> dict:
+    """Entries and deep byte size of the stream cache, per namespace (see /debug/memory)."""
+    usage, seen = {}, {}
+    for key, entry in list(_stream_cache.items()):
+        namespace = _namespace(key)
+        row = usage.setdefault(namespace, {"entries": 0, "bytes": 0})
+        row["entries"] += 1
+        row["bytes"] += sys.getsizeof(key) + metrics.sizeof(entry, seen.setdefault(namespace, set()))
+    return usage
+
+
+# ── Extraction paths ──────────────────────────────────────────────────────────
+# A path is (watch URL template, player clients). Sequential mode keeps the
+# original order: music.youtube.com then www.youtube.com, both clients at once.
+# SCRAPER_CONCURRENT_ATTEMPTS=1 races one path per host × client and takes the
+# first success. Either way the winning path is remembered per video, so repeat
+# extractions (e.g. after URL expiry) go straight to it.
+_ATTEMPT_HOSTS = (
+    "https://music.youtube.com/watch?v={}",
+    "https://www.youtube.com/watch?v={}",
+)
+_ATTEMPT_CLIENTS = ("android", "ios")
+_CONCURRENT_ATTEMPTS = os.environ.get("SCRAPER_CONCURRENT_ATTEMPTS", "0") == "1"
+_WINNING_PATHS_MAX = 10000
+
+_winning_paths: "OrderedDict[str, tuple]" = OrderedDict()
+_attempt_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _attempt_paths() -> list:
+    if _CONCURRENT_ATTEMPTS:
+        return [(host, (client,)) for host in _ATTEMPT_HOSTS for client in _ATTEMPT_CLIENTS]
+    return [(host, _ATTEMPT_CLIENTS) for host in _ATTEMPT_HOSTS]
+
+
+def _run_attempt(video_id: str, path: tuple, audio_only: bool = False) -> Optional[dict]:
+    host, clients = path
+    t0 = time.perf_counter()
+    outcome = "fail"
+    try:
+        with _pooled_ydl(player_clients=clients, audio_only=audio_only) as ydl:
+            # Audio-only callers read raw formats themselves, so skip format sorting/selection
+            info = ydl.extract_info(host.format(video_id), download=False, process=not audio_only)
+        outcome = "ok" if info else "fail"
+        return info
+    finally:
+        EXTRACT_SECONDS.observe(
+            time.perf_counter() - t0, host.split("/")[2], ",".join(clients), outcome
+        )
+
+
+def _remember_path(video_id: str, path: tuple) -> None:
+    _winning_paths[video_id] = path
+    _winning_paths.move_to_end(video_id)
+    while len(_winning_paths) > _WINNING_PATHS_MAX:
+        _winning_paths.popitem(last=False)
+
+
+def _race_attempts(video_id: str, paths: list, audio_only: bool = False):
+    """Run all paths at once; return (info, path, last_error) for the first success."""
+    global _attempt_executor
+    if _attempt_executor is None:
+        _attempt_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ydl-attempt")
+    pending = {_attempt_executor.submit(_run_attempt, video_id, p, audio_only): p for p in paths}
+    last_error = None
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            path = pending.pop(future)
+            try:
+                info = future.result()
+            except Exception as e:
+                last_error = e
+                logger.warning(f"yt-dlp attempt failed for {path[0].format(video_id)} {path[1]}: {e}")
+                continue
+            if info:
+                # Losers keep running in the background; their results are dropped
+                return info, path, last_error
+    return None, None, last_error
 
-    # Try music.youtube.com first, fallback to youtube.com
-    urls_to_try = [
-        f"https://music.youtube.com/watch?v={video_id}",
-        f"https://www.youtube.com/watch?v={video_id}",
-    ]
 
-    info = None
+def _find_info(video_id: str, audio_only: bool, remembered: Optional[tuple]):
+    """Returns (info, winning path), trying the remembered path first. Raises on failure."""
     last_error = None
-    for url in urls_to_try:
+    if remembered:
         try:
-            with yt_dlp.YoutubeDL(_build_ydl_opts()) as ydl:
-                info = ydl.extract_info(url, download=False)
+            info = _run_attempt(video_id, remembered, audio_only)
             if info:
-                break
+                return info, remembered
         except Exception as e:
             last_error = e
-            logger.warning(f"yt-dlp attempt failed for {url}: {e}")
-            continue
+            logger.warning(f"yt-dlp remembered path failed for {video_id}: {e}")
+
+    paths = [p for p in _attempt_paths() if p != remembered]
+    if _CONCURRENT_ATTEMPTS:
+        info, path, error = _race_attempts(video_id, paths, audio_only)
+        last_error = error or last_error
+    else:
+        info = path = None
+        for candidate in paths:
+            try:
+                info = _run_attempt(video_id, candidate, audio_only)
+                if info:
+                    path = candidate
+                    break
+            except Exception as e:
+                last_error = e
+                logger.warning(f"yt-dlp attempt failed for {candidate[0].format(video_id)}: {e}")
+                continue
 
     if not info:
         raise Exception(f"yt-dlp failed for {video_id}: {last_error}")
+    return info, path
 
-    title = info.get("title", "Unknown")
-    thumbnail = info.get("thumbnail", "")
-    duration = info.get("duration", 0)
-    raw_formats = info.get("formats") or []
 
-    # ── Audio streams ─────────────────────────────────────────────────────────
-    audio_streams = []
+_INFO_KEYS = ("title", "thumbnail", "duration")
+_FORMAT_KEYS = ("url", "vcodec", "acodec", "abr", "tbr", "asr", "format_note", "ext", "format_id", "filesize", "resolution", "height", "fps")
+
+
+def _find_info_slim(video_id: str, audio_only: bool, remembered: Optional[tuple]):
+    """Process-pool entry point: only ship back the fields extract_* actually read."""
+    info, path = _find_info(video_id, audio_only, remembered)
+    slim = {k: info.get(k) for k in _INFO_KEYS}
+    slim["formats"] = [{k: f.get(k) for k in _FORMAT_KEYS if k in f} for f in info.get("formats") or [] if f]
+    return slim, path
+
+
+# Optional: run yt-dlp in worker processes (GROOVIA_EXTRACT_PROCESSES)
+_extract_pool = process_pool.from_env(warm_modules=("yt_dlp", "scraper"))
+
+
+def _extract_info(video_id: str, audio_only: bool = False) -> dict:
+    """yt-dlp info for a video; the winning path is remembered in this process."""
+    remembered = _winning_paths.get(video_id)
+    if _extract_pool:
+        info, path = _extract_pool.run(_find_info_slim, video_id, audio_only, remembered)
+    else:
+        info, path = _find_info(video_id, audio_only, remembered)
+    _remember_path(video_id, path)
+    return info
+
+
+# ── Core extractor ─────────────────────────────────────────────────────────────
+def _number(value) -> float:
+    try:
+        return float(value or 0)
+    except (ValueError, TypeError):
+        return 0
+
+
+def _audio_bitrate(f: dict) -> float:
+    """abr is only filled in by yt-dlp's format processing; audio-only extraction
+    skips that (process=False), where the total bitrate is the audio bitrate."""
+    return _number(f.get("abr")) or _number(f.get("tbr"))
+
+
+def _audio_quality(abr: float, format_note) -> str:
+    if abr > 0:
+        return "high" if abr >= 128 else "low"
+    # No bitrate at all: YouTube's own label ("medium", "low", "ultralow")
+    return "high" if str(format_note or "").lower() in ("high", "medium") else "low"
+
+
+def _audio_streams(raw_formats: list) -> list:
+    """Pure-audio formats as API stream dicts, best bitrate first."""
+    ranked = []
     for f in raw_formats:
         if not f:
             continue
@@ -131,31 +437,40 @@ def extract_streams(video_id: str) -> dict:
         if not url_f:
             continue
         
-        # Safe extraction of bitrate
-        try:
-            abr = float(f.get("abr") or 0)
-        except (ValueError, TypeError):
-            abr = 0
-            
+        abr = _audio_bitrate(f)
         ext = f.get("ext", "webm")
-        audio_streams.append({
+        ranked.append(((abr, _number(f.get("asr"))), {
             "url": url_f,
             "bitrate": f"{int(abr)}kbps" if abr > 0 else "unknown",
             "codec": f.get("acodec", "unknown"),
             "mimeType": f"audio/{ext}",
-            "quality": "high" if abr >= 128 else "low",
+            "quality": _audio_quality(abr, f.get("format_note")),
             "itag": str(f.get("format_id", "")),
             "size": f.get("filesize"),
-        })
+        }))
+
+    # Sort descending by bitrate, sample rate as the tie-break
+    ranked.sort(key=lambda pair: pair[0], reverse=True)
+    return [stream for _, stream in ranked]
 
-    # Sort descending by bitrate
-    def sort_key(x):
-        try:
-            return int(x["bitrate"].replace("kbps", ""))
-        except (ValueError, KeyError):
-            return 0
 
-    audio_streams.sort(key=sort_key, reverse=True)
+def extract_streams(video_id: str) -> dict:
+    """
+    Extract all audio and video streams for a YouTube video using yt-dlp.
+    Returns dict with audio_streams and video_streams lists.
+    """
+    cached = _get_cached(video_id)
+    if cached:
+        return cached
+
+    info = _extract_info(video_id)
+
+    title = info.get("title", "Unknown")
+    thumbnail = info.get("thumbnail", "")
+    duration = info.get("duration", 0)
+    raw_formats = info.get("formats") or []
+
+    audio_streams = _audio_streams(raw_formats)
 
     # ── Video streams ─────────────────────────────────────────────────────────
     video_streams = []
@@ -196,11 +511,39 @@ def extract_streams(video_id: str) -> dict:
     return result
 
 
+def extract_audio(video_id: str) -> dict:
+    """
+    Audio-only extraction for /audio and /stream: no video format processing,
+    no yt-dlp format selection, and a smaller cached record (no video_streams).
+    Reuses a full extract_streams result when one is already cached.
+    """
+    # One lookup decides the outcome: count it once, under "audio"
+    cached = _get_cached(video_id, count=False) or _get_cached(f"audio:{video_id}", count=False)
+    CACHE_REQUESTS.inc("audio", "hit" if cached else "miss")
+    if cached:
+        return cached
+
+    info = _extract_info(video_id, audio_only=True)
+    audio_streams = _audio_streams(info.get("formats") or [])
+
+    result = {
+        "videoId": video_id,
+        "title": info.get("title", "Unknown"),
+        "thumbnail": info.get("thumbnail", ""),
+        "duration": info.get("duration", 0),
+        "audio_streams": audio_streams[:8],
+    }
+
+    _set_cache(f"audio:{video_id}", result)
+    logger.info(f"✅ yt-dlp extracted {len(audio_streams)} audio streams (audio-only) for {video_id}")
+    return result
+
+
 # ── Convenience helpers ───────────────────────────────────────────────────────
 def get_best_audio(video_id: str) -> Optional[dict]:
     """Get the highest-quality audio stream."""
     try:
-        data = extract_streams(video_id)
+        data = extract_audio(video_id)
         streams = data["audio_streams"]
         return streams[0] if streams else None
     except Exception as e:
@@ -223,14 +566,18 @@ def get_best_video(video_id: str, max_quality: str = "1080p") -> Optional[dict]:
         return None
 
 
+def select_audio(video_id: str, quality: str = "high") -> Optional[dict]:
+    """Like get_audio_by_quality, but extraction errors propagate to the caller."""
+    streams = extract_audio(video_id)["audio_streams"]
+    if not streams:
+        return None
+    return streams[0] if quality == "high" else streams[-1]
+
+
 def get_audio_by_quality(video_id: str, quality: str = "high") -> Optional[dict]:
     """Get audio stream by quality preference ('high' or 'low')."""
     try:
-        data = extract_streams(video_id)
-        streams = data["audio_streams"]
-        if not streams:
-            return None
-        return streams[0] if quality == "high" else streams[-1]
+        return select_audio(video_id, quality)
     except Exception as e:
         logger.error(f"get_audio_by_quality failed: {e}")
         return None
@@ -0,0 +1,397 @@
+"""
+Offline benchmark for server.py.
+
+Starts two local stand-ins and a real server.py against them:
+  • InnerTube — answers /youtubei/v1/<endpoint> from the payloads in
+    bench_fixtures/ (player falls back to song.json), plus the embed page and
+    player JS that player_cipher looks up
+  • googlevideo — a Range-capable byte server over song.mp4, throttled per
+    connection with --throttle-kbps
+
+Then drives /stream, /search, /watch and /charts at the given concurrency and
+reports TTFB, latency p50/p99, throughput and server RSS.
+
+The charts and chart-playlist browses in bench_fixtures/ are ytmusicapi's own
+recorded test responses; search.json and next.json are built from that
+playlist's tracks. `--record` replaces them all with live captures.
+
+  python bench.py                                # all scenarios, defaults
+  python bench.py -s stream -c 32 -n 400 --throttle-kbps 512
+  python bench.py --save base.json               # later: --compare base.json
+  python bench.py --record                       # refresh fixtures (needs network)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Header, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "bench_fixtures")
+
+SCENARIOS = {
+    "stream": lambda i, keys: f"/stream?videoId=bench{i % keys:05d}",
+    "search": lambda i, keys: f"/search?query=bench+query+{i % keys}",
+    "watch": lambda i, keys: f"/watch?videoId=bench{i % keys:05d}",
+    "charts": lambda i, keys: "/charts?country=IN",
+}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Fixtures
+# ─────────────────────────────────────────────────────────────────────────────
+def _fixture_key(endpoint: str, body: dict) -> str:
+    key = endpoint.strip("/").replace("/", "_")
+    return f"{key}__{body['browseId']}" if body.get("browseId") else key
+
+
+def _load_fixtures() -> dict:
+    fixtures = {}
+    if os.path.isdir(FIXTURES):
+        for name in os.listdir(FIXTURES):
+            if name.endswith(".json"):
+                with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+                    fixtures[name[:-5]] = json.load(f)
+    if "player" not in fixtures and os.path.exists(os.path.join(HERE, "song.json")):
+        with open(os.path.join(HERE, "song.json"), encoding="utf-8") as f:
+            fixtures["player"] = json.load(f)
+    return fixtures
+
+
+def _load_media() -> bytes:
+    path = os.path.join(HERE, "song.mp4")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+    return os.urandom(4 * 1024 * 1024)
+
+
+def _player_payload(template: dict, base: str, size: int) -> dict:
+    """Recorded player response with every audio format pointed at the fake googlevideo."""
+    data = json.loads(json.dumps(template))
+    streaming = data.setdefault("streamingData", {})
+    for key in ("adaptiveFormats", "formats"):
+        for fmt in streaming.get(key, []):
+            fmt.pop("signatureCipher", None)
+            fmt["url"] = f"{base}/videoplayback?itag={fmt.get('itag')}&clen={size}"
+            fmt["contentLength"] = str(size)
+    return data
+
+
+def record() -> None:
+    """Capture fresh InnerTube payloads for every endpoint the scenarios touch."""
+    from ytmusicapi import YTMusic
+
+    captured = {}
+
+    class Recorder(YTMusic):
+        def _send_request(self, endpoint, body, additionalParams=""):
+            response = super()._send_request(endpoint, body, additionalParams)
+            captured.setdefault(_fixture_key(endpoint, body), response)
+            return response
+
+    yt = Recorder()
+    results = yt.search("Oasis Wonderwall", filter="songs")
+    video_id = next(r["videoId"] for r in results if r.get("videoId"))
+    yt.get_watch_playlist(videoId=video_id)
+    charts = yt.get_charts(country="IN")
+    # /charts follows up with the first chart playlist
+    playlist_id = next((v.get("playlistId") for v in charts.get("videos", []) if v.get("playlistId")), None)
+    if playlist_id:
+        yt.get_playlist(playlistId=playlist_id, limit=30)
+    yt.get_song(video_id)
+    os.makedirs(FIXTURES, exist_ok=True)
+    for key, payload in captured.items():
+        with open(os.path.join(FIXTURES, f"{key}.json"), "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        print(f"📼 {key}.json")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Fake upstreams (InnerTube + googlevideo on one port)
+# ─────────────────────────────────────────────────────────────────────────────
+def make_upstream(base: str, fixtures: dict, media: bytes, throttle_kbps: int, latency_ms: int) -> FastAPI:
+    app = FastAPI()
+    app.state.missing = set()
+    player = _player_payload(fixtures.get("player", {}), base, len(media))
+    delay = latency_ms / 1000
+
+    @app.get("/")
+    async def home():
+        # ytmusicapi scrapes the visitor id from the landing page
+        return HTMLResponse('<script>ytcfg.set({"VISITOR_DATA": "bench"});</script>')
+
+    # Player lookup (player_cipher): the embed page names the player JS, which carries the timestamp
+    @app.get("/embed/{video_id}")
+    async def embed(video_id: str):
+        return HTMLResponse('<script>{"jsUrl":"\\/s\\/player\\/bench0000\\/player_ias.vflset\\/en_US\\/base.js"}</script>')
+
+    @app.get("/s/player/{path:path}")
+    async def player_js(path: str):
+        return Response("var bench={signatureTimestamp:20000};", media_type="text/javascript")
+
+    @app.post("/youtubei/v1/{endpoint:path}")
+    async def innertube(endpoint: str, request: Request):
+        await asyncio.sleep(delay)
+        body = await request.json()
+        key = _fixture_key(endpoint, body)
+        if endpoint == "player":
+            payload = dict(player, videoDetails={**player.get("videoDetails", {}), "videoId": body.get("videoId")})
+            return JSONResponse(payload)
+        payload = fixtures.get(key, fixtures.get(key.split("__")[0]))
+        if payload is None:
+            # An empty 200 would let the scenario "succeed" with no results
+            app.state.missing.add(key)
+            return JSONResponse({"error": f"no fixture for {key}"}, status_code=404)
+        return JSONResponse(payload)
+
+    @app.get("/videoplayback")
+    async def videoplayback(range_header: str = Header(None, alias="range")):
+        await asyncio.sleep(delay)
+        size = len(media)
+        start, end = 0, size - 1
+        match = re.match(r"bytes=(\d*)-(\d*)", range_header or "")
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:
+                start = max(0, size - int(match.group(2)))
+            if start >= size:
+                return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        chunk = 64 * 1024
+        per_chunk = chunk / (throttle_kbps * 1024) if throttle_kbps else 0
+
+        async def body():
+            for offset in range(start, end + 1, chunk):
+                yield media[offset:min(offset + chunk, end + 1)]
+                if per_chunk:
+                    await asyncio.sleep(per_chunk)
+
+        headers = {"Accept-Ranges": "bytes", "Content-Length": str(end - start + 1)}
+        status = 200
+        if match:
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            status = 206
+        return StreamingResponse(body(), status_code=status, media_type="audio/mp4", headers=headers)
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve_in_thread(app: FastAPI, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def _start_server(port: int, upstream: str, workdir: str, extra_env: dict) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "PYTHONPATH": HERE + os.pathsep + os.environ.get("PYTHONPATH", ""),
+        "GROOVIA_INNERTUBE_URL": upstream,
+        "GROOVIA_YOUTUBE_URL": upstream,
+        "GROOVIA_SCRAPER_URL": upstream,  # Layer 2 gets a 404 here rather than calling Vercel
+        "YT_COOKIES_B64": "",
+        **extra_env,
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("server.py exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server.py did not come up within 60s")
+
+
+def _rss_kb(pid: int) -> dict:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return {k: int(fields[k].split()[0]) for k in ("VmRSS", "VmHWM")}
+    except (OSError, KeyError, ValueError):
+        return {}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Load generator
+# ─────────────────────────────────────────────────────────────────────────────
+def _pct(values: list, q: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+async def _one(client: httpx.AsyncClient, path: str, headers: dict) -> tuple:
+    t0 = time.perf_counter()
+    ttfb = None
+    received = 0
+    async with client.stream("GET", path, headers=headers) as resp:
+        async for chunk in resp.aiter_bytes():
+            if ttfb is None:
+                ttfb = time.perf_counter() - t0
+            received += len(chunk)
+        status = resp.status_code
+    total = time.perf_counter() - t0
+    return status, ttfb if ttfb is not None else total, total, received
+
+
+async def run_scenario(base: str, name: str, requests: int, concurrency: int, keys: int, stream_bytes: int) -> dict:
+    headers = {"Range": f"bytes=0-{stream_bytes - 1}"} if name == "stream" and stream_bytes else {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results, errors = [], 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(SCENARIOS[name](i, keys))
+
+    async with httpx.AsyncClient(base_url=base, timeout=120, limits=limits) as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                path = queue.get_nowait()
+                try:
+                    status, ttfb, total, received = await _one(client, path, headers)
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                if status >= 400:
+                    errors += 1
+                else:
+                    results.append((ttfb, total, received))
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - t0
+
+    ttfbs = [r[0] * 1000 for r in results]
+    totals = [r[1] * 1000 for r in results]
+    received = sum(r[2] for r in results)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(len(results) / wall, 1) if wall else None,
+        "ttfb_p50_ms": _round(_pct(ttfbs, 0.5)),
+        "ttfb_p99_ms": _round(_pct(ttfbs, 0.99)),
+        "p50_ms": _round(_pct(totals, 0.5)),
+        "p99_ms": _round(_pct(totals, 0.99)),
+        "throughput_mib_s": round(received / wall / 2**20, 2) if wall else None,
+    }
+
+
+def _round(value):
+    return round(value, 1) if value is not None else None
+
+
+def _compare(report: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, cur in report["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        for metric in ("p99_ms", "ttfb_p99_ms"):
+            if cur.get(metric) and old.get(metric) and cur[metric] > old[metric] * (1 + tolerance):
+                regressions.append(f"{name}.{metric}: {old[metric]} → {cur[metric]}")
+        if cur.get("throughput_mib_s") and old.get("throughput_mib_s") \
+                and cur["throughput_mib_s"] < old["throughput_mib_s"] * (1 - tolerance):
+            regressions.append(f"{name}.throughput_mib_s: {old['throughput_mib_s']} → {cur['throughput_mib_s']}")
+        if cur["errors"] > old.get("errors", 0):
+            regressions.append(f"{name}.errors: {old.get('errors', 0)} → {cur['errors']}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark for server.py")
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS), help="repeatable; default all")
+    parser.add_argument("-n", "--requests", type=int, default=200)
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("--keys", type=int, default=20, help="distinct videoIds / queries (first use of each is cold)")
+    parser.add_argument("--stream-bytes", type=int, default=1024 * 1024, help="Range length per /stream request; 0 = whole file")
+    parser.add_argument("--throttle-kbps", type=int, default=0, help="googlevideo per-connection rate; 0 = unthrottled")
+    parser.add_argument("--upstream-latency-ms", type=int, default=20)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra env for server.py")
+    parser.add_argument("--save", help="write the report as JSON")
+    parser.add_argument("--compare", help="baseline JSON; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--record", action="store_true", help="record InnerTube fixtures from live YouTube and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        record()
+        return 0
+
+    fixtures = _load_fixtures()
+    media = _load_media()
+    upstream_port, server_port = _free_port(), _free_port()
+    upstream_base = f"http://127.0.0.1:{upstream_port}"
+    upstream_app = make_upstream(upstream_base, fixtures, media, args.throttle_kbps, args.upstream_latency_ms)
+    upstream = _serve_in_thread(upstream_app, upstream_port)
+
+    workdir = tempfile.mkdtemp(prefix="groovia-bench-")
+    extra_env = dict(kv.split("=", 1) for kv in args.env)
+    proc = _start_server(server_port, upstream_base, workdir, extra_env)
+    report = {"config": {k: v for k, v in vars(args).items() if k not in ("save", "compare", "record")},
+              "rss_kb_start": _rss_kb(proc.pid), "scenarios": {}}
+    try:
+        for name in args.scenario or list(SCENARIOS):
+            result = asyncio.run(run_scenario(
+                f"http://127.0.0.1:{server_port}", name, args.requests, args.concurrency, args.keys, args.stream_bytes
+            ))
+            result["rss_kb"] = _rss_kb(proc.pid)
+            report["scenarios"][name] = result
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+        upstream.should_exit = True
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    cols = ("requests", "errors", "rps", "ttfb_p50_ms", "ttfb_p99_ms", "p50_ms", "p99_ms", "throughput_mib_s")
+    print(f"{'scenario':<8} " + " ".join(f"{c:>16}" for c in cols) + f" {'rss_mib':>8}")
+    for name, r in report["scenarios"].items():
+        rss = r["rss_kb"].get("VmRSS")
+        print(f"{name:<8} " + " ".join(f"{str(r[c]):>16}" for c in cols) + f" {rss / 1024 if rss else 0:>8.1f}")
+    if upstream_app.state.missing:
+        print(f"⚠️  No fixture for: {', '.join(sorted(upstream_app.state.missing))} — run `python bench.py --record`")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = _compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"❌ regression {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""
+Extraction-strategy benchmark.
+
+Every strategy — server.py's InnerTube layer, pytubefix per client, yt-dlp per
+player-client set — runs against recorded upstream traffic, so numbers are
+reproducible and measure our CPU work rather than YouTube's latency. Reports
+success rate, wall time, CPU time and peak traced allocations per strategy.
+
+  python bench_extract.py --record               # capture cassettes (needs network + cookies.txt)
+  python bench_extract.py                        # replay every strategy offline
+  python bench_extract.py -s innertube -s "ytdlp:ios" --repeat 10 --save extract.json
+
+Cassettes live in bench_fixtures/extract/<strategy>__<videoId>.json.gz. Requests
+are matched on method + host + path, in recorded order. The committed cassettes
+replay song.json's player response (plain audio URLs) behind each strategy's own
+request sequence, so they time our parsing and format selection, not
+deciphering; `--record` replaces them with live traffic.
+"""
+
+import argparse
+import base64
+import contextlib
+import gzip
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.error
+from unittest import mock
+from urllib.parse import urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CASSETTES = os.path.join(HERE, "bench_fixtures", "extract")
+
+VIDEO_IDS = ["DRZHVrSmcWU", "PVDPkS4v8FQ", "i1o1p_DD6TU", "kJQP7kiw5Fk", "CK5dtbG19mo"]
+
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Cassette — recorded responses, replayed by method + host + path
+# ─────────────────────────────────────────────────────────────────────────────
+class Cassette:
+    def __init__(self, path: str, mode: str):
+        self.path = path
+        self.mode = mode
+        self.entries: list = []
+        self._by_key: dict = {}
+        self._served: dict = {}
+        if mode == "replay":
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for entry in json.load(f):
+                    self._by_key.setdefault(entry["key"], []).append(entry)
+
+    @staticmethod
+    def _key(method: str, url: str) -> str:
+        parts = urlsplit(url)
+        return f"{(method or 'GET').upper()} {parts.netloc}{parts.path or '/'}"
+
+    def add(self, method: str, url: str, status: int, headers: dict, body: bytes) -> None:
+        self.entries.append({
+            "key": self._key(method, url),
+            "url": url,
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS},
+            "body": base64.b64encode(body).decode(),
+        })
+
+    def find(self, method: str, url: str) -> tuple:
+        key = self._key(method, url)
+        recorded = self._by_key.get(key)
+        if not recorded:
+            raise LookupError(f"no recorded response for {key}")
+        i = self._served.get(key, 0)
+        self._served[key] = i + 1
+        entry = recorded[min(i, len(recorded) - 1)]
+        return entry["status"], entry["headers"], base64.b64decode(entry["body"])
+
+    def rewind(self) -> None:
+        self._served = {}
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+
+
+class _UrllibResponse(io.BytesIO):
+    """Enough of http.client.HTTPResponse for pytubefix."""
+
+    def __init__(self, body: bytes, url: str, status: int, headers: dict):
+        super().__init__(body)
+        self.url, self.status, self.code, self.headers = url, status, status, headers
+
+    def info(self):
+        return self.headers
+
+    def geturl(self):
+        return self.url
+
+    def getcode(self):
+        return self.status
+
+
+@contextlib.contextmanager
+def _patched(cassette: Cassette):
+    """Route requests (ytmusicapi), urllib (pytubefix), yt-dlp and httpx through the cassette."""
+    import httpx
+    import pytubefix.request
+    import requests
+    import yt_dlp
+    from yt_dlp.networking import Request as YDLRequest
+    from yt_dlp.networking import Response as YDLResponse
+    from yt_dlp.networking.exceptions import HTTPError as YDLHTTPError
+
+    real_session_send = requests.Session.send
+    real_execute = pytubefix.request._execute_request
+    real_urlopen = yt_dlp.YoutubeDL.urlopen
+    real_httpx_send = httpx.Client.send
+    recording = cassette.mode == "record"
+
+    def session_send(session, request, **kwargs):
+        if recording:
+            resp = real_session_send(session, request, **kwargs)
+            cassette.add(request.method, request.url, resp.status_code, dict(resp.headers), resp.content)
+            return resp
+        status, headers, body = cassette.find(request.method, request.url)
+        resp = requests.Response()
+        resp.status_code, resp._content, resp.url, resp.request = status, body, request.url, request
+        resp.headers = requests.structures.CaseInsensitiveDict(headers)
+        resp.reason = "OK" if status < 400 else "Error"
+        return resp
+
+    def execute(url, method=None, headers=None, data=None, timeout=None):
+        method = method or ("POST" if data else "GET")
+        if recording:
+            try:
+                resp = real_execute(url, method=method, headers=headers, data=data, **({"timeout": timeout} if timeout else {}))
+            except urllib.error.HTTPError as e:
+                body = e.read()
+                cassette.add(method, url, e.code, dict(e.headers.items()), body)
+                raise urllib.error.HTTPError(url, e.code, e.reason, e.headers, io.BytesIO(body))
+            body = resp.read()
+            cassette.add(method, url, resp.status, dict(resp.headers.items()), body)
+            return _UrllibResponse(body, url, resp.status, dict(resp.headers.items()))
+        status, resp_headers, body = cassette.find(method, url)
+        if status >= 400:
+            raise urllib.error.HTTPError(url, status, "recorded error", resp_headers, io.BytesIO(body))
+        return _UrllibResponse(body, url, status, resp_headers)
+
+    def urlopen(ydl, req):
+        req = YDLRequest(req) if isinstance(req, str) else req
+        if recording:
+            try:
+                resp = real_urlopen(ydl, req)
+            except YDLHTTPError as e:
+                body = e.response.read()
+                headers = dict(e.response.headers.items())
+                cassette.add(req.method, req.url, e.status, headers, body)
+                raise YDLHTTPError(YDLResponse(io.BytesIO(body), req.url, headers, e.status)) from None
+            body = resp.read()
+            headers = dict(resp.headers.items())
+            cassette.add(req.method, req.url, resp.status, headers, body)
+            return YDLResponse(io.BytesIO(body), resp.url, headers, resp.status, resp.reason)
+        status, headers, body = cassette.find(req.method, req.url)
+        resp = YDLResponse(io.BytesIO(body), req.url, headers, status)
+        if status >= 400:
+            raise YDLHTTPError(resp)
+        return resp
+
+    def httpx_send(client, request, **kwargs):
+        if recording:
+            resp = real_httpx_send(client, request, **kwargs)
+            resp.read()
+            cassette.add(request.method, str(request.url), resp.status_code, dict(resp.headers), resp.content)
+            return resp
+        status, headers, body = cassette.find(request.method, str(request.url))
+        return httpx.Response(status, headers=headers, content=body, request=request)
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(requests.Session, "send", session_send))
+        stack.enter_context(mock.patch.object(pytubefix.request, "_execute_request", execute))
+        stack.enter_context(mock.patch.object(yt_dlp.YoutubeDL, "urlopen", urlopen))
+        stack.enter_context(mock.patch.object(httpx.Client, "send", httpx_send))
+        yield
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Strategies — each returns a playable audio URL or None
+# ─────────────────────────────────────────────────────────────────────────────
+def _innertube(video_id: str):
+    import extract_layers
+    result = extract_layers.innertube_extract(video_id)
+    return result and result["url"]
+
+
+def _pytubefix(client: str = None):
+    def run(video_id: str):
+        from pytubefix import YouTube
+        kwargs = {"client": client} if client else {}
+        yt = YouTube(f"https://music.youtube.com/watch?v={video_id}", use_oauth=False, allow_oauth_cache=False, **kwargs)
+        stream = yt.streams.filter(only_audio=True).order_by("abr").desc().first()
+        return stream and stream.url
+    return run
+
+
+def _ytdlp(clients: tuple):
+    def run(video_id: str):
+        import yt_dlp
+        opts = {
+            "format": "bestaudio/best",
+            "quiet": True,
+            "no_warnings": True,
+            "cachedir": False,
+            "extractor_args": {"youtube": {"player_client": list(clients)}},
+        }
+        if os.path.exists("cookies.txt"):
+            opts["cookiefile"] = "cookies.txt"
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            info = ydl.extract_info(f"https://music.youtube.com/watch?v={video_id}", download=False)
+            ydl.params["cookiefile"] = None  # keep the recorded jar untouched on close
+        return info and info.get("url")
+    return run
+
+
+STRATEGIES = {
+    "innertube": _innertube,                      # server.py Layer 0
+    "pytubefix": _pytubefix(),                    # server.py Layer 1
+    "pytubefix:ANDROID_MUSIC": _pytubefix("ANDROID_MUSIC"),
+    "ytdlp:tv_embedded": _ytdlp(("tv_embedded",)),
+    "ytdlp:tv_embedded,web": _ytdlp(("tv_embedded", "web")),
+    "ytdlp:android": _ytdlp(("android",)),
+    "ytdlp:android,web": _ytdlp(("android", "web")),
+    "ytdlp:ios": _ytdlp(("ios",)),
+    "ytdlp:web": _ytdlp(("web",)),
+}
+
+
+def _cassette_path(strategy: str, video_id: str) -> str:
+    return os.path.join(CASSETTES, f"{strategy.replace(':', '_').replace(',', '+')}__{video_id}.json.gz")
+
+
+def _run_once(fn, video_id: str) -> tuple:
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    try:
+        ok, error = bool(fn(video_id)), None
+    except Exception as e:
+        ok, error = False, str(e)[:120]
+    return ok, time.perf_counter() - wall0, time.process_time() - cpu0, error
+
+
+def _peak_alloc(fn, video_id: str) -> int:
+    tracemalloc.start()
+    try:
+        _run_once(fn, video_id)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench(strategy: str, video_ids: list, repeat: int, record: bool) -> dict:
+    fn = STRATEGIES[strategy]
+    walls, cpus, peaks, ok_count, runs, errors = [], [], [], 0, 0, {}
+    for video_id in video_ids:
+        path = _cassette_path(strategy, video_id)
+        if not record and not os.path.exists(path):
+            continue
+        cassette = Cassette(path, "record" if record else "replay")
+        with _patched(cassette):
+            for _ in range(1 if record else repeat):
+                cassette.rewind()
+                ok, wall, cpu, error = _run_once(fn, video_id)
+                runs += 1
+                ok_count += ok
+                walls.append(wall * 1000)
+                cpus.append(cpu * 1000)
+                if error:
+                    errors[video_id] = error
+            if not record:
+                cassette.rewind()
+                peaks.append(_peak_alloc(fn, video_id))
+        if record:
+            cassette.save()
+    return {
+        "runs": runs,
+        "success_rate": round(ok_count / runs, 3) if runs else None,
+        "wall_p50_ms": round(statistics.median(walls), 1) if walls else None,
+        "wall_mean_ms": round(statistics.fmean(walls), 1) if walls else None,
+        "cpu_mean_ms": round(statistics.fmean(cpus), 1) if cpus else None,
+        "alloc_peak_mib": round(max(peaks) / 2**20, 2) if peaks else None,
+        "errors": errors,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark stream-URL extraction strategies on recorded traffic")
+    parser.add_argument("-s", "--strategy", action="append", choices=sorted(STRATEGIES), help="repeatable; default all")
+    parser.add_argument("-v", "--video", action="append", help=f"repeatable; default {', '.join(VIDEO_IDS)}")
+    parser.add_argument("--repeat", type=int, default=5, help="timed replays per video")
+    parser.add_argument("--record", action="store_true", help="hit live YouTube once per strategy/video and save cassettes")
+    parser.add_argument("--save", help="write the report as JSON")
+    args = parser.parse_args()
+
+    strategies = args.strategy or list(STRATEGIES)
+    video_ids = args.video or VIDEO_IDS
+    # server.py and yt-dlp read/write cookies.txt in the working directory
+    workdir = tempfile.mkdtemp(prefix="groovia-extract-bench-")
+    if args.record and os.path.exists(os.path.join(HERE, "cookies.txt")):
+        shutil.copy(os.path.join(HERE, "cookies.txt"), workdir)
+    sys.path.insert(0, HERE)
+    os.chdir(workdir)
+    if "innertube" in strategies:
+        import extract_layers  # noqa: F401 — keep its import cost out of the first timed run
+
+    report = {}
+    try:
+        for strategy in strategies:
+            report[strategy] = bench(strategy, video_ids, args.repeat, args.record)
+    finally:
+        os.chdir(HERE)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    cols = ("runs", "success_rate", "wall_p50_ms", "wall_mean_ms", "cpu_mean_ms", "alloc_peak_mib")
+    print(f"{'strategy':<24} " + " ".join(f"{c:>14}" for c in cols))
+    for strategy, r in report.items():
+        print(f"{strategy:<24} " + " ".join(f"{str(r[c]):>14}" for c in cols))
+        if not r["runs"]:
+            print(f"{'':<24}   no cassettes — run `python bench_extract.py --record -s {strategy}`")
+        for video_id, error in r["errors"].items():
+            print(f"{'':<24}   {video_id}: {error}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
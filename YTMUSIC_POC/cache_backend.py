@@ -0,0 +1,207 @@
+"""
+Pluggable cache backends for server.py.
+
+  memory  (default) — per-process dict, same behaviour as the original _cache
+  sqlite            — one shared file, safe across uvicorn/gunicorn workers
+  redis             — any Redis-compatible server (needs the `redis` package)
+
+Select with GROOVIA_CACHE_BACKEND; GROOVIA_CACHE_URL is the SQLite path or
+Redis URL. Every backend also provides a short-lived named lock so that only
+one worker runs a cold extraction while the others wait for its result.
+Values must be JSON-serializable for the shared backends.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    name = "memory"
+
+    _SWEEP_EVERY = 500
+
+    def __init__(self):
+        self._data: dict = {}
+        self._locks: dict = {}
+        self._mutex = threading.Lock()
+        self._writes = 0
+        self.on_evict = None  # optional callback(key) when an expired entry is dropped
+
+    def get(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.time():
+            if self._data.pop(key, None) is not None and self.on_evict:
+                self.on_evict(key)
+            return None
+        return value
+
+    def set(self, key: str, value, ttl: int) -> None:
+        self._data[key] = (value, time.time() + ttl)
+        self._writes += 1
+        if self._writes % self._SWEEP_EVERY == 0:
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Drop every expired entry (most are never read again); returns how many."""
+        now, dropped = time.time(), 0
+        for key in list(self._data):
+            entry = self._data.get(key)
+            if entry and entry[1] <= now and self._data.pop(key, None) is not None:
+                dropped += 1
+                if self.on_evict:
+                    self.on_evict(key)
+        return dropped
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def snapshot(self) -> list:
+        """(key, value, expires_at) for every stored entry, expired ones included."""
+        return [(key, value, expires_at) for key, (value, expires_at) in list(self._data.items())]
+
+    def acquire(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        with self._mutex:
+            if self._locks.get(key, 0) > now:
+                return False
+            self._locks[key] = now + ttl
+            return True
+
+    def release(self, key: str) -> None:
+        with self._mutex:
+            self._locks.pop(key, None)
+
+    def locked(self, key: str) -> bool:
+        return self._locks.get(key, 0) > time.time()
+
+
+class SQLiteBackend:
+    """Shared store in a single SQLite file (WAL mode), one connection per thread."""
+    name = "sqlite"
+
+    _PURGE_EVERY = 500
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS locks (key TEXT PRIMARY KEY, expires_at REAL NOT NULL);
+            """
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        row = self._conn().execute(
+            "SELECT value FROM kv WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value, ttl: int) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, separators=(",", ":")), time.time() + ttl),
+        )
+        self._writes += 1
+        if self._writes % self._PURGE_EVERY == 0:
+            conn.execute("DELETE FROM kv WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def acquire(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("DELETE FROM locks WHERE key = ? AND expires_at <= ?", (key, now))
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO locks (key, expires_at) VALUES (?, ?)", (key, now + ttl)
+        )
+        return cur.rowcount == 1
+
+    def release(self, key: str) -> None:
+        self._conn().execute("DELETE FROM locks WHERE key = ?", (key,))
+
+    def locked(self, key: str) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM locks WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row is not None
+
+
+class RedisBackend:
+    name = "redis"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("GROOVIA_CACHE_BACKEND=redis needs the `redis` package") from e
+        self._r = redis.Redis.from_url(url)
+
+    def get(self, key: str):
+        raw = self._r.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value, ttl: int) -> None:
+        self._r.set(key, json.dumps(value, separators=(",", ":")), ex=max(1, int(ttl)))
+
+    def delete(self, key: str) -> None:
+        self._r.delete(key)
+
+    def acquire(self, key: str, ttl: float) -> bool:
+        return bool(self._r.set(key, b"1", nx=True, px=int(ttl * 1000)))
+
+    def release(self, key: str) -> None:
+        self._r.delete(key)
+
+    def locked(self, key: str) -> bool:
+        return bool(self._r.exists(key))
+
+
+def from_env():
+    kind = os.environ.get("GROOVIA_CACHE_BACKEND", "memory").lower()
+    if kind == "sqlite":
+        backend = SQLiteBackend(os.environ.get("GROOVIA_CACHE_URL", "groovia_cache.db"))
+    elif kind == "redis":
+        backend = RedisBackend(os.environ.get("GROOVIA_CACHE_URL", "redis://localhost:6379/0"))
+    else:
+        backend = MemoryBackend()
+    logger.info(f"🗄️  Cache backend: {backend.name}")
+    return backend
+
+
+def wait_for(backend, key: str, lock_key: str, timeout: float, poll: float = 0.05):
+    """
+    Block until another worker holding `lock_key` publishes `key`.
+    Returns the value, or None if the lock went away (or timed out) without one.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        value = backend.get(key)
+        if value is not None:
+            return value
+        if not backend.locked(lock_key):
+            return backend.get(key)
+        time.sleep(poll)
+    return None
@@ -0,0 +1,130 @@
+"""
+Cold-start report: where import time goes, and how long until the port answers.
+
+  python coldstart.py                  # server.py and YOUTUBE_SCRAPER/api.py
+  python coldstart.py --top 25         # more modules per app
+  python coldstart.py --ready          # also time spawn → first 200 from GET /
+  python coldstart.py --save cold.json
+
+Import times come from `python -X importtime` in a fresh interpreter, run from
+a temp directory so nothing is written next to the code. Times are cumulative
+(a module includes everything it imports), listed per direct import of the app
+module; a package shared by several imports counts against the first.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+import bench
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APPS = {
+    "server": (HERE, "server", "server:app"),
+    "api": (os.path.join(os.path.dirname(HERE), "YOUTUBE_SCRAPER"), "api", "api:app"),
+}
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_profile(app_dir: str, module: str, workdir: str) -> dict:
+    env = {**os.environ, "PYTHONPATH": app_dir, "GROOVIA_WARM_UP": "0", "SCRAPER_WARM_UP": "0"}
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=workdir, env=env, capture_output=True, text=True, timeout=120,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    # importtime prints children before their parent: collect the direct imports
+    # (depth 2) seen since the last top-level line, and keep them if that line is ours
+    children, packages, total_us = [], {}, 0
+    for self_us, cumulative_us, indent, name in _LINE.findall(proc.stderr):
+        depth = (len(indent) + 1) // 2
+        if depth == 2:
+            children.append((name, int(cumulative_us)))
+        elif depth == 1:
+            if name == module:
+                total_us = int(cumulative_us)
+                for child, us in children:
+                    top = child.split(".")[0]
+                    packages[top] = packages.get(top, 0) + us
+                packages[f"({module} itself)"] = int(self_us)
+            children = []
+    return {
+        "import_ms": round(total_us / 1000, 1),
+        "interpreter_ms": round(wall * 1000, 1),
+        "packages_ms": {k: round(v / 1000, 1) for k, v in sorted(packages.items(), key=lambda kv: -kv[1])},
+    }
+
+
+def time_to_ready(app_dir: str, target: str, workdir: str) -> float:
+    port = bench._free_port()
+    env = {**os.environ, "PYTHONPATH": app_dir}
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env,
+    )
+    try:
+        deadline = start + 60
+        while time.perf_counter() < deadline:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                    return round((time.perf_counter() - start) * 1000, 1)
+            except httpx.HTTPError:
+                pass
+            if proc.poll() is not None:
+                raise RuntimeError(f"{target} exited with {proc.returncode}")
+            time.sleep(0.02)
+        raise RuntimeError(f"{target} not ready after 60s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import-time and time-to-ready report")
+    parser.add_argument("apps", nargs="*", help=f"any of {', '.join(APPS)} (default: all)")
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--ready", action="store_true", help="spawn uvicorn and time the first GET /")
+    parser.add_argument("--save", help="write the report as JSON")
+    args = parser.parse_args()
+    unknown = set(args.apps) - set(APPS)
+    if unknown:
+        parser.error(f"unknown app(s): {', '.join(sorted(unknown))}")
+
+    report = {}
+    workdir = tempfile.mkdtemp(prefix="groovia-coldstart-")
+    try:
+        for name in args.apps or list(APPS):
+            app_dir, module, target = APPS[name]
+            row = import_profile(app_dir, module, workdir)
+            if args.ready:
+                row["ready_ms"] = time_to_ready(app_dir, target, workdir)
+            report[name] = row
+
+            print(f"{name}: import {row['import_ms']} ms (interpreter total {row['interpreter_ms']} ms)"
+                  + (f", ready in {row['ready_ms']} ms" if "ready_ms" in row else ""))
+            for package, ms in list(row["packages_ms"].items())[:args.top]:
+                print(f"  {package:<24} {ms:>8.1f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""
+Layers 0 and 1 of stream URL extraction (InnerTube via ytmusicapi, then
+pytubefix), split out of server.py so GROOVIA_EXTRACT_PROCESSES workers import
+only this: no FastAPI app, caches, stores or pools. Importing it has no side
+effects (bar the bench-only GROOVIA_INNERTUBE_URL redirect below); cookies.txt
+is written on first use (ensure_cookies).
+"""
+
+import base64
+import logging
+import os
+import threading
+import time
+
+import metrics
+import player_cipher
+import tracing
+
+logger = logging.getLogger(__name__)
+
+STREAM_CACHE_TTL = 3000  # ~50 min, well inside googlevideo's URL expiry
+
+EXTRACT_SECONDS = metrics.Histogram("groovia_extract_seconds", "Stream URL extraction latency per layer", ("layer", "outcome"))
+
+
+class LocalLayersFailed(ValueError):
+    """Layers 0 and 1 found nothing; the caller falls back to the remote scraper."""
+
+    @property
+    def reason(self):
+        return self.args[1] if len(self.args) > 1 else None
+
+
+def _redirect_ytmusicapi(innertube_url: str) -> None:
+    import ytmusicapi.helpers
+    import ytmusicapi.mixins.browsing
+    import ytmusicapi.ytmusic
+    base = innertube_url.rstrip("/")
+    ytmusicapi.helpers.YTM_DOMAIN = ytmusicapi.mixins.browsing.YTM_DOMAIN = base
+    ytmusicapi.ytmusic.YTM_BASE_API = base + "/youtubei/v1/"
+    logger.warning(f"🧪 InnerTube requests go to {base}")
+
+
+# Point ytmusicapi at a stand-in InnerTube (bench.py); unset in production. Applied at
+# import, so every YTMusic (server's shared one, Layer 0's, pool workers') uses it.
+if os.environ.get("GROOVIA_INNERTUBE_URL"):
+    _redirect_ytmusicapi(os.environ["GROOVIA_INNERTUBE_URL"])
+
+# Why the last InnerTube call on this thread gave up (e.g. "UNPLAYABLE: Video unavailable")
+_innertube_failure = threading.local()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Cookies Setup for Cloud Deployment (Render bot bypass)
+# ─────────────────────────────────────────────────────────────────────────────
+cookies_b64 = os.environ.get("YT_COOKIES_B64")
+_cookies_ready = False
+_cookies_lock = threading.Lock()
+
+def _setup_cookies():
+    # 1. First try Env Var (Fastest)
+    if cookies_b64:
+        try:
+            cookies_txt = base64.b64decode(cookies_b64).decode("utf-8")
+            with open("cookies.txt", "w") as f:
+                f.write(cookies_txt)
+            logger.info("🍪 Decoded YT_COOKIES_B64 from ENV and generated cookies.txt for bot bypass.")
+            return
+        except Exception as e:
+            logger.error(f"❌ Failed to decode ENV cookies: {e}")
+
+    # 2. Try looking for the raw or b64 file in the filesystem
+    potential_paths = [
+        "cookies_b64_for_render.txt", 
+        "../cookies_b64_for_render.txt",
+        "cookies.txt"
+    ]
+    
+    for path in potential_paths:
+        if os.path.exists(path):
+            if path.endswith("cookies.txt"):
+                logger.info("🍪 Found existing cookies.txt directly in filesystem.")
+                return
+            else:
+                try:
+                    with open(path, "r") as f:
+                        b64_content = f.read().strip()
+                    cookies_txt = base64.b64decode(b64_content).decode("utf-8")
+                    with open("cookies.txt", "w") as f:
+                        f.write(cookies_txt)
+                    logger.info(f"🍪 Decoded '{path}' and generated cookies.txt for bot bypass.")
+                    return
+                except Exception as e:
+                    logger.error(f"❌ Failed to decode file {path}: {e}")
+                    
+    logger.warning("⚠️ NO COOKIES FOUND: yt-dlp will run unauthenticated and might get blocked by YouTube on Datacenter IPs!")
+
+def ensure_cookies():
+    """Materialize cookies.txt once, on first extraction or during warm-up."""
+    global _cookies_ready
+    if _cookies_ready:
+        return
+    with _cookies_lock:
+        if not _cookies_ready:
+            _setup_cookies()
+            _cookies_ready = True
+
+def _parse_netscape_cookies(filepath: str) -> dict:
+    """Parse a Netscape cookies.txt file into a name→value dict."""
+    cookies = {}
+    try:
+        with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                parts = line.split("\t")
+                if len(parts) >= 7:
+                    cookies[parts[5]] = parts[6]
+    except Exception:
+        pass
+    return cookies
+
+
+def _make_sapisidhash(sapisid: str, origin: str = "https://www.youtube.com") -> str:
+    """Generate YouTube SAPISIDHASH authorization header value."""
+    import hashlib
+    ts = int(time.time())
+    h = hashlib.sha1(f"{ts} {sapisid} {origin}".encode()).hexdigest()
+    return f"SAPISIDHASH {ts}_{h}"
+
+
+def innertube_extract(video_id: str) -> dict | None:
+    """
+    Call YouTube InnerTube API via ytmusicapi with full authentication from cookies.txt.
+    Works from ANY IP (including Render datacenter) when valid auth cookies present.
+    """
+    ensure_cookies()
+    with tracing.span("cookies.parse"):
+        cookies = _parse_netscape_cookies("cookies.txt") if os.path.exists("cookies.txt") else {}
+    
+    headers = None
+    if cookies:
+        cookie_str = "; ".join(f"{k}={v}" for k, v in cookies.items())
+        sapisid = cookies.get("SAPISID") or cookies.get("__Secure-3PAPISID") or cookies.get("__Secure-1PAPISID")
+        if sapisid:
+            import hashlib
+            ts = int(time.time())
+            h = hashlib.sha1(f"{ts} {sapisid} https://music.youtube.com".encode()).hexdigest()
+            auth = f"SAPISIDHASH {ts}_{h}"
+            headers = {"Cookie": cookie_str, "Authorization": auth}
+
+    # Signed formats only decipher with the player whose signatureTimestamp we sent.
+    # Send the known one if any; the player is only looked up once a format needs it.
+    _, signature_timestamp = player_cipher.known_player()
+
+    try:
+        from ytmusicapi import YTMusic
+
+        with tracing.span("ytmusic.init", authenticated=bool(headers)):
+            if headers:
+                yt = YTMusic(auth=headers)
+            else:
+                yt = YTMusic()
+
+        with tracing.span("ytmusic.get_song"):
+            data = yt.get_song(video_id, signatureTimestamp=signature_timestamp)
+    except Exception as e:
+        logger.warning(f"InnerTube request failed: {e}")
+        return None
+
+    playability = data.get("playabilityStatus", {})
+    status = playability.get("status")
+    if status not in ("OK", None):
+        reason = playability.get("reason", "unknown")
+        logger.warning(f"InnerTube playability [{status}] for {video_id}: {reason}")
+        _innertube_failure.reason = f"{status}: {reason}"
+        return None
+
+    streaming_data = data.get("streamingData", {})
+    formats = streaming_data.get("adaptiveFormats", []) + streaming_data.get("formats", [])
+
+    audio_formats = [
+        f for f in formats
+        if f.get("mimeType", "").startswith("audio") and (f.get("url") or f.get("signatureCipher"))
+    ]
+
+    if not audio_formats:
+        logger.warning(f"InnerTube: no audio formats for {video_id}")
+        _innertube_failure.reason = "no audio formats"
+        return None
+
+    m4a = [f for f in audio_formats if "mp4" in f.get("mimeType", "")]
+    chosen = sorted(m4a or audio_formats, key=lambda f: f.get("averageBitrate", f.get("bitrate", 0)), reverse=True)[0]
+
+    if chosen.get("url"):
+        stream_url = chosen["url"]
+    else:
+        # Signed format — decrypt inline with the cached player cipher. The result is not
+        # probed: anything that goes wrong here falls through to Layer 1/2.
+        try:
+            with tracing.span("cipher.player"):
+                player_url, sts = player_cipher.current_player()
+            if sts != signature_timestamp:
+                # Sent a different (or no) timestamp: ask again so the signature matches this player
+                with tracing.span("ytmusic.get_song", retry="signatureTimestamp"):
+                    data = yt.get_song(video_id, signatureTimestamp=sts)
+                streaming_data = data.get("streamingData", {})
+                formats = streaming_data.get("adaptiveFormats", []) + streaming_data.get("formats", [])
+                chosen = next(f for f in formats if f.get("itag") == chosen.get("itag"))
+            with tracing.span("cipher.decipher"):
+                stream_url = chosen.get("url") or player_cipher.decipher(chosen["signatureCipher"], player_url)
+        except Exception as e:
+            logger.warning(f"InnerTube: signature decryption failed for {video_id}: {str(e)[:120]}")
+            return None
+    mime = chosen.get("mimeType", "audio/webm")
+    ext = "m4a" if "mp4" in mime else "webm"
+    title = data.get("videoDetails", {}).get("title", video_id)
+
+    logger.info(f"🎵 InnerTube SUCCESS for {video_id} [{ext}] @ {chosen.get('averageBitrate', '?')}bps")
+    return {
+        "url": stream_url,
+        "ext": ext,
+        "http_headers": {"User-Agent": "Mozilla/5.0"},
+        "title": title,
+    }
+
+
+def extract(video_id: str) -> dict:
+    """
+    Audio URL extraction - the local layers:
+    LAYER 0 (PRIMARY): YouTube InnerTube API (ytmusicapi.get_song)
+    LAYER 1: pytubefix (local fallback)
+    LAYER 2, the remote Vercel scraper, runs on server.py's event loop.
+    """
+    url = None
+    ext = "webm"
+    http_headers = {"User-Agent": "Mozilla/5.0"}
+    title_res = video_id
+    _innertube_failure.reason = None
+
+    # ── LAYER 0: InnerTube direct API ────────────────────────────────────────
+    t0 = time.perf_counter()
+    try:
+        logger.info(f"🔍 Layer 0: InnerTube API for {video_id}...")
+        with tracing.span("layer.innertube"):
+            result = innertube_extract(video_id)
+        if result:
+            url = result["url"]
+            ext = result["ext"]
+            http_headers = result["http_headers"]
+            title_res = result["title"]
+            logger.info(f"🎵 Layer 0 InnerTube SUCCESS for {video_id} [{ext}]")
+    except Exception as e:
+        logger.warning(f"⚠️ Layer 0 (InnerTube) failed: {str(e)[:120]}")
+    EXTRACT_SECONDS.observe(time.perf_counter() - t0, "innertube", "ok" if url else "fail")
+
+    # ── LAYER 1: pytubefix ────────────────────────────────────────────────────
+    if not url:
+        t0 = time.perf_counter()
+        try:
+            logger.info(f"🔍 Layer 1: pytubefix for {video_id}...")
+            with tracing.span("layer.pytubefix"):
+                from pytubefix import YouTube
+                yt = YouTube(f"https://music.youtube.com/watch?v={video_id}", use_oauth=False, allow_oauth_cache=False)
+                audio_streams = yt.streams.filter(only_audio=True).order_by('abr').desc()
+            if audio_streams:
+                best_audio = audio_streams[0]
+                url = best_audio.url
+                ext = "m4a" if "mp4" in best_audio.mime_type else "webm"
+                http_headers = {"User-Agent": "Mozilla/5.0"}
+                title_res = yt.title or video_id
+                logger.info(f"🎵 Layer 1 pytubefix SUCCESS for {video_id}")
+        except Exception as e:
+            logger.warning(f"⚠️ Layer 1 pytubefix failed: {str(e)[:100]}")
+        EXTRACT_SECONDS.observe(time.perf_counter() - t0, "pytubefix", "ok" if url else "fail")
+
+    if url:
+        return {
+            "url": url, "ext": ext,
+            "http_headers": http_headers, "title": title_res,
+            "expires_at": time.time() + STREAM_CACHE_TTL
+        }
+
+    raise LocalLayersFailed(f"Layers 0-1 exhausted for {video_id}", _innertube_failure.reason)
@@ -0,0 +1,212 @@
+"""
+Local full-text index over every track / album / artist / playlist the server
+has already seen in an upstream response.
+SQLite FTS5, one file on disk, no extra dependencies.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+_DB_PATH = os.environ.get("GROOVIA_INDEX_PATH", "local_index.db")
+
+# ytmusicapi search filter → indexed kind
+FILTER_KINDS = {
+    "songs": "song",
+    "videos": "video",
+    "albums": "album",
+    "artists": "artist",
+    "playlists": "playlist",
+}
+
+# Only these keys are kept in the stored payload (keeps rows small)
+_PAYLOAD_KEYS = (
+    "resultType", "videoId", "browseId", "playlistId", "title", "artist", "artists",
+    "album", "duration", "duration_seconds", "thumbnails", "year", "videoType",
+    "isExplicit", "category",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    artists TEXT NOT NULL DEFAULT '',
+    album TEXT NOT NULL DEFAULT '',
+    payload TEXT NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS entities_fts USING fts5(
+    title, artists, album,
+    content='entities', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS entities_ai AFTER INSERT ON entities BEGIN
+    INSERT INTO entities_fts(rowid, title, artists, album)
+    VALUES (new.rowid, new.title, new.artists, new.album);
+END;
+CREATE TRIGGER IF NOT EXISTS entities_ad AFTER DELETE ON entities BEGIN
+    INSERT INTO entities_fts(entities_fts, rowid, title, artists, album)
+    VALUES ('delete', old.rowid, old.title, old.artists, old.album);
+END;
+CREATE TRIGGER IF NOT EXISTS entities_au AFTER UPDATE ON entities BEGIN
+    INSERT INTO entities_fts(entities_fts, rowid, title, artists, album)
+    VALUES ('delete', old.rowid, old.title, old.artists, old.album);
+    INSERT INTO entities_fts(rowid, title, artists, album)
+    VALUES (new.rowid, new.title, new.artists, new.album);
+END;
+"""
+
+# A richer payload (more bytes) wins over a name/id stub seen inside another entity
+_UPSERT = """
+INSERT INTO entities (kind, id, title, artists, album, payload, seen_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (kind, id) DO UPDATE SET
+    title = CASE WHEN length(excluded.payload) >= length(payload) THEN excluded.title ELSE title END,
+    artists = CASE WHEN length(excluded.payload) >= length(payload) THEN excluded.artists ELSE artists END,
+    album = CASE WHEN length(excluded.payload) >= length(payload) THEN excluded.album ELSE album END,
+    payload = CASE WHEN length(excluded.payload) >= length(payload) THEN excluded.payload ELSE payload END,
+    seen_at = excluded.seen_at
+"""
+
+_lock = threading.Lock()
+_conn = None
+
+
+def _db() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(_DB_PATH, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        _conn.executescript(_SCHEMA)
+        logger.info(f"🗂️  Local index ready at {_DB_PATH}")
+    return _conn
+
+
+# ── Entity extraction ─────────────────────────────────────────────────────────
+def _names(value) -> str:
+    if isinstance(value, list):
+        return ", ".join(a.get("name", "") for a in value if isinstance(a, dict))
+    if isinstance(value, dict):
+        return value.get("name", "")
+    return value or ""
+
+
+def _entity(node: dict):
+    """Classify one ytmusicapi dict as (kind, id, title, artists, album, payload), or None."""
+    result_type = node.get("resultType")
+    title = node.get("title")
+
+    if node.get("videoId") and title:
+        kind = result_type if result_type in ("song", "video") else (
+            "video" if node.get("videoType") == "MUSIC_VIDEO_TYPE_UGC" else "song"
+        )
+        ident = node["videoId"]
+    elif result_type == "artist" and node.get("browseId"):
+        kind, ident, title = "artist", node["browseId"], node.get("artist") or title
+    elif result_type == "album" and node.get("browseId"):
+        kind, ident = "album", node["browseId"]
+    elif result_type == "playlist" and (node.get("browseId") or node.get("playlistId")):
+        kind, ident = "playlist", node.get("browseId") or node["playlistId"]
+    elif str(node.get("browseId", "")).startswith("UC") and title:
+        kind, ident = "artist", node["browseId"]
+    elif str(node.get("browseId", "")).startswith("MPRE") and title:
+        kind, ident = "album", node["browseId"]
+    elif node.get("name") and str(node.get("id") or "").startswith("UC"):
+        kind, ident, title = "artist", node["id"], node["name"]
+    elif node.get("name") and str(node.get("id") or "").startswith("MPRE"):
+        kind, ident, title = "album", node["id"], node["name"]
+    else:
+        return None
+
+    if not title:
+        return None
+    payload = {k: node[k] for k in _PAYLOAD_KEYS if node.get(k) is not None}
+    payload["resultType"] = kind
+    payload.setdefault("title", title)
+    payload.setdefault("videoId" if kind in ("song", "video") else "browseId", ident)
+    return (
+        kind, ident, title,
+        _names(node.get("artists") or node.get("artist")) if kind != "artist" else "",
+        _names(node.get("album")),
+        json.dumps(payload, separators=(",", ":")),
+    )
+
+
+def _walk(node, out: list):
+    if isinstance(node, list):
+        for item in node:
+            _walk(item, out)
+    elif isinstance(node, dict):
+        entity = _entity(node)
+        if entity:
+            out.append(entity)
+        for value in node.values():
+            if isinstance(value, (list, dict)):
+                _walk(value, out)
+
+
+# ── Public API ────────────────────────────────────────────────────────────────
+def ingest(results) -> int:
+    """Index every entity found in an upstream response. Never raises."""
+    entities: list = []
+    _walk(results, entities)
+    if not entities:
+        return 0
+    now = time.time()
+    try:
+        with _lock:
+            conn = _db()
+            with conn:
+                conn.executemany(_UPSERT, [(*e, now) for e in entities])
+        return len(entities)
+    except Exception as e:
+        logger.warning(f"Local index ingest failed: {e}")
+        return 0
+
+
+def _fts_query(query: str) -> str:
+    """Turn free text into an FTS5 AND-of-prefix-terms query."""
+    text = unicodedata.normalize("NFKC", query).casefold()
+    terms = ["".join(c if c.isalnum() else " " for c in t).split() for t in text.split()]
+    flat = [w for group in terms for w in group]
+    return " ".join(f'"{w}"*' for w in flat)
+
+
+def search(query: str, filter: str = None, limit: int = 20) -> list:
+    """Ranked local search. `filter` uses the same names as ytmusicapi search."""
+    match = _fts_query(query)
+    if not match:
+        return []
+    sql = (
+        "SELECT e.payload FROM entities_fts f JOIN entities e ON e.rowid = f.rowid "
+        "WHERE entities_fts MATCH ?"
+    )
+    params: list = [match]
+    kind = FILTER_KINDS.get(filter) if filter else None
+    if kind:
+        sql += " AND e.kind = ?"
+        params.append(kind)
+    sql += " ORDER BY bm25(entities_fts, 10.0, 3.0, 1.0) LIMIT ?"
+    params.append(limit)
+    try:
+        with _lock:
+            rows = _db().execute(sql, params).fetchall()
+    except Exception as e:
+        logger.warning(f"Local index search failed: {e}")
+        return []
+    return [json.loads(r[0]) for r in rows]
+
+
+def stats() -> dict:
+    with _lock:
+        rows = _db().execute("SELECT kind, COUNT(*) FROM entities GROUP BY kind").fetchall()
+    return {kind: count for kind, count in rows}
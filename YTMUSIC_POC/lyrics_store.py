@@ -0,0 +1,86 @@
+"""
+Persistent lyrics store.
+Lyrics almost never change, so hits are kept for months and survive restarts.
+"No lyrics" answers are cached too (negative cache) so they are not retried on
+every request; transient upstream errors get a much shorter TTL.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_DB_PATH = os.environ.get("GROOVIA_LYRICS_PATH", "lyrics.db")
+
+FOUND_TTL = 90 * 86400     # lyrics text
+MISSING_TTL = 7 * 86400    # upstream says this song has no lyrics
+ERROR_TTL = 600            # upstream failed; retry soon
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lyrics (
+    browse_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload TEXT,
+    expires_at REAL NOT NULL
+);
+"""
+
+_lock = threading.Lock()
+_conn = None
+
+
+def _db() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(_DB_PATH, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        _conn.executescript(_SCHEMA)
+        logger.info(f"📝 Lyrics store ready at {_DB_PATH}")
+    return _conn
+
+
+def get(browse_id: str):
+    """
+    Returns (hit, data). `hit` is False when nothing fresh is stored;
+    a hit with data None means "known to have no lyrics".
+    """
+    try:
+        with _lock:
+            row = _db().execute(
+                "SELECT status, payload, expires_at FROM lyrics WHERE browse_id = ?", (browse_id,)
+            ).fetchone()
+    except Exception as e:
+        logger.warning(f"Lyrics store read failed: {e}")
+        return False, None
+    if not row or row[2] <= time.time():
+        return False, None
+    status, payload, _ = row
+    return True, (json.loads(payload) if status == "ok" and payload else None)
+
+
+def put(browse_id: str, data) -> None:
+    """Store a lyrics result; `data` None records a negative entry."""
+    status, ttl = ("ok", FOUND_TTL) if data else ("missing", MISSING_TTL)
+    _write(browse_id, status, json.dumps(data) if data else None, ttl)
+
+
+def put_error(browse_id: str) -> None:
+    _write(browse_id, "error", None, ERROR_TTL)
+
+
+def _write(browse_id: str, status: str, payload, ttl: int) -> None:
+    try:
+        with _lock:
+            conn = _db()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO lyrics (browse_id, status, payload, expires_at) VALUES (?, ?, ?, ?)",
+                    (browse_id, status, payload, time.time() + ttl),
+                )
+    except Exception as e:
+        logger.warning(f"Lyrics store write failed: {e}")
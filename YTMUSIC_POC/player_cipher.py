@@ -0,0 +1,170 @@
+"""
+Signature / n-parameter decryption for InnerTube formats that come back with
+`signatureCipher` instead of a plain `url` (productionised custom_decrypt.py).
+
+The player JS is fetched once per player version and kept on disk, the parsed
+pytubefix Cipher is kept in memory per version, and sig / n results are
+memoized, so a warm player resolves a signed format without any network call.
+
+Signatures only decipher with the player whose signatureTimestamp the player
+request carried, so callers take both from current_player() and pass the
+same js_url back to decipher(). known_player() answers from memory only, for
+callers that don't yet know whether they need a cipher at all.
+"""
+
+import functools
+import logging
+import os
+import re
+import threading
+import time
+import urllib.parse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_CACHE_DIR = os.environ.get("GROOVIA_PLAYER_CACHE", "player_cache")
+PLAYER_URL_TTL = 3600          # how often to re-check which player version is live
+PLAYER_RETRY_AFTER = 60        # after a failed lookup, fail fast for this long
+_YOUTUBE = os.environ.get("GROOVIA_YOUTUBE_URL", "https://www.youtube.com").rstrip("/")  # stand-in: bench.py
+_EMBED_URL = _YOUTUBE + "/embed/jNQXAC9IVRw"
+_JS_URL_RE = re.compile(r'"jsUrl":"([^"]+)"')
+_PLAYER_ID_RE = re.compile(r"/s/player/([\w-]+)/")
+_STS_RE = re.compile(r"signatureTimestamp[=:](\d+)")
+
+_lock = threading.Lock()       # guards the dicts below; never held across network or parsing
+_player_url = {"url": None, "t": 0.0, "failed": 0.0}
+_ciphers: dict = {}            # player id → (Cipher, call lock)
+_load_locks: dict = {}         # player id → lock serializing that player's download + parse
+_timestamps: dict = {}         # player id → signatureTimestamp
+
+
+def _player_id(js_url: str) -> str:
+    match = _PLAYER_ID_RE.search(js_url)
+    return match.group(1) if match else re.sub(r"\W", "_", js_url)[-40:]
+
+
+def current_js_url() -> str:
+    """URL of the live player JS, refreshed at most once per PLAYER_URL_TTL."""
+    with _lock:
+        if _player_url["url"] and time.time() - _player_url["t"] < PLAYER_URL_TTL:
+            return _player_url["url"]
+        if time.time() - _player_url["failed"] < PLAYER_RETRY_AFTER:
+            raise ValueError("player lookup failed recently")
+    try:
+        html = httpx.get(_EMBED_URL, timeout=10, headers={"User-Agent": "Mozilla/5.0"}).text
+        match = _JS_URL_RE.search(html)
+        if not match:
+            raise ValueError("jsUrl not found on embed page")
+    except Exception:
+        with _lock:
+            _player_url["failed"] = time.time()
+        raise
+    js_url = _YOUTUBE + match.group(1).replace("\\/", "/")
+    with _lock:
+        _player_url.update(url=js_url, t=time.time())
+    return js_url
+
+
+def current_player() -> tuple:
+    """(js_url, signatureTimestamp) of the live player; send the timestamp with the player request."""
+    js_url = current_js_url()
+    pid = _player_id(js_url)
+    sts = _timestamps.get(pid)
+    if sts is None:
+        match = _STS_RE.search(_load_js(js_url))
+        if not match:
+            raise ValueError(f"signatureTimestamp not found in player {pid}")
+        sts = _timestamps[pid] = int(match.group(1))
+    return js_url, sts
+
+
+def known_player() -> tuple:
+    """(js_url, signatureTimestamp) if already resolved and fresh, else (None, None); never fetches."""
+    with _lock:
+        js_url = _player_url["url"] if time.time() - _player_url["t"] < PLAYER_URL_TTL else None
+    sts = _timestamps.get(_player_id(js_url)) if js_url else None
+    return (js_url, sts) if sts is not None else (None, None)
+
+
+def _load_lock(pid: str) -> threading.Lock:
+    with _lock:
+        return _load_locks.setdefault(pid, threading.Lock())
+
+
+def _load_js(js_url: str) -> str:
+    with _load_lock(_player_id(js_url)):
+        return _read_or_download_js(js_url)
+
+
+def _read_or_download_js(js_url: str) -> str:
+    path = os.path.join(_CACHE_DIR, f"{_player_id(js_url)}.js")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    js = httpx.get(js_url, timeout=15, headers={"User-Agent": "Mozilla/5.0"}).text
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(js)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"Could not persist player JS {path}: {e}")
+    logger.info(f"🔐 Downloaded player JS {_player_id(js_url)}")
+    return js
+
+
+def _cipher(js_url: str):
+    pid = _player_id(js_url)
+    entry = _ciphers.get(pid)
+    if entry is None:
+        with _load_lock(pid):
+            entry = _ciphers.get(pid)
+            if entry is None:
+                from pytubefix.cipher import Cipher
+                entry = (Cipher(js=_read_or_download_js(js_url), js_url=js_url), threading.Lock())
+                _ciphers[pid] = entry
+                logger.info(f"🔐 Cipher functions parsed for player {pid}")
+    return entry
+
+
+@functools.lru_cache(maxsize=4096)
+def _sig(js_url: str, s: str) -> str:
+    cipher, call_lock = _cipher(js_url)
+    with call_lock:
+        return cipher.get_sig(s)
+
+
+@functools.lru_cache(maxsize=4096)
+def _nsig(js_url: str, n: str) -> str:
+    cipher, call_lock = _cipher(js_url)
+    with call_lock:
+        return cipher.get_nsig(n)
+
+
+def _apply_nsig(url: str, js_url: str) -> str:
+    parsed = urllib.parse.urlparse(url)
+    query = urllib.parse.parse_qs(parsed.query, keep_blank_values=True)
+    if "n" not in query:
+        return url
+    query["n"] = [_nsig(js_url, query["n"][0])]
+    return urllib.parse.urlunparse(parsed._replace(query=urllib.parse.urlencode(query, doseq=True)))
+
+
+def decipher(signature_cipher: str, js_url: str = None) -> str:
+    """Turn a format's `signatureCipher` into a playable googlevideo URL."""
+    js_url = js_url or current_js_url()
+    parts = urllib.parse.parse_qs(signature_cipher)
+    url = parts["url"][0]
+    sp = parts.get("sp", ["signature"])[0]
+    sig = _sig(js_url, parts["s"][0])
+    url = _apply_nsig(url, js_url)
+    return f"{url}&{sp}={urllib.parse.quote(sig)}"
+
+
+def warm() -> None:
+    """Load the live player's timestamp and cipher ahead of the first signed format."""
+    js_url, _ = current_player()
+    _cipher(js_url)
@@ -0,0 +1,183 @@
+"""
+Replay a traffic log recorded by traffic_log.py (GROOVIA_TRAFFIC_LOG).
+
+Requests are re-issued with their original spacing divided by --speed, with the
+same params and Range headers, and each response body is read only as far as
+the original client read it. Each recorded client gets its own synthetic
+X-Forwarded-For, so per-client limits see the same clients as production.
+
+  python replay.py traffic.jsonl                 # server.py against bench.py's local stand-ins
+  python replay.py traffic.jsonl --speed 10      # 10x faster than recorded
+  python replay.py traffic.jsonl --speed 0       # as fast as possible
+  python replay.py traffic.jsonl --target http://localhost:8001
+  python replay.py traffic.jsonl --env GROOVIA_CACHE_BACKEND=sqlite
+
+Reports latency per route and, when the target exposes /metrics, cache hit rates.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+import bench
+
+
+def load(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    entries.sort(key=lambda e: e["t"])
+    return entries
+
+
+def _forwarded_for(client: str) -> str:
+    n = int(client[:6], 16)
+    return f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}"
+
+
+async def _replay_one(client: httpx.AsyncClient, entry: dict, results: dict) -> None:
+    headers = {"X-Forwarded-For": _forwarded_for(entry.get("client", "000000"))}
+    if entry.get("range"):
+        headers["Range"] = entry["range"]
+    limit = entry.get("bytes") or 0
+    t0 = time.perf_counter()
+    ttfb, received, status = None, 0, None
+    try:
+        async with client.stream(entry.get("method", "GET"), entry["path"], params=entry.get("params"), headers=headers) as resp:
+            status = resp.status_code
+            ttfb = time.perf_counter() - t0
+            async for chunk in resp.aiter_raw():
+                received += len(chunk)
+                if limit and received >= limit:
+                    break  # the original client stopped here (seek / skip)
+    except httpx.HTTPError:
+        status = "error"
+    route = results[entry["path"]]
+    route["status"][str(status)] += 1
+    if ttfb is not None:
+        route["ttfb"].append(ttfb * 1000)
+        route["total"].append((time.perf_counter() - t0) * 1000)
+        route["bytes"] += received
+
+
+async def replay(base: str, entries: list, speed: float, max_inflight: int) -> tuple:
+    results = defaultdict(lambda: {"status": defaultdict(int), "ttfb": [], "total": [], "bytes": 0})
+    slots = asyncio.Semaphore(max_inflight)
+    limits = httpx.Limits(max_connections=max_inflight, max_keepalive_connections=max_inflight)
+    lag = []
+
+    async with httpx.AsyncClient(base_url=base, timeout=120, limits=limits) as client:
+        async def run(entry):
+            try:
+                await _replay_one(client, entry, results)
+            finally:
+                slots.release()
+
+        tasks = []
+        start, first = time.perf_counter(), entries[0]["t"] if entries else 0
+        for entry in entries:
+            if speed:
+                delay = (entry["t"] - first) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    lag.append(-delay)
+            await slots.acquire()
+            tasks.append(asyncio.ensure_future(run(entry)))
+        await asyncio.gather(*tasks)
+        wall = time.perf_counter() - start
+    return results, wall, (max(lag) * 1000 if lag else 0.0)
+
+
+def _cache_hit_rates(base: str) -> dict:
+    try:
+        text = httpx.get(f"{base}/metrics", timeout=5).text
+    except httpx.HTTPError:
+        return {}
+    counts = defaultdict(lambda: {"hit": 0.0, "miss": 0.0})
+    pattern = r'\w+_cache_requests_total\{namespace="([^"]+)",result="(hit|miss)"\} ([\d.e+]+)'
+    for namespace, result, value in re.findall(pattern, text):
+        counts[namespace][result] += float(value)
+    return {ns: round(c["hit"] / (c["hit"] + c["miss"]), 3) for ns, c in counts.items() if c["hit"] + c["miss"]}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay a recorded traffic log")
+    parser.add_argument("log", help="JSON-lines file written by GROOVIA_TRAFFIC_LOG")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression; 0 = no pacing")
+    parser.add_argument("--target", help="replay against a running server instead of a local one")
+    parser.add_argument("--max-inflight", type=int, default=256)
+    parser.add_argument("--throttle-kbps", type=int, default=0, help="local googlevideo per-connection rate")
+    parser.add_argument("--upstream-latency-ms", type=int, default=20)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra env for the local server")
+    parser.add_argument("--save", help="write the report as JSON")
+    args = parser.parse_args()
+
+    entries = load(args.log)
+    if not entries:
+        print("Log is empty")
+        return 1
+
+    proc = upstream = workdir = None
+    base = args.target
+    if not base:
+        upstream_port, server_port = bench._free_port(), bench._free_port()
+        upstream_base = f"http://127.0.0.1:{upstream_port}"
+        upstream = bench._serve_in_thread(
+            bench.make_upstream(upstream_base, bench._load_fixtures(), bench._load_media(),
+                                args.throttle_kbps, args.upstream_latency_ms),
+            upstream_port,
+        )
+        workdir = tempfile.mkdtemp(prefix="groovia-replay-")
+        proc = bench._start_server(server_port, upstream_base, workdir, dict(kv.split("=", 1) for kv in args.env))
+        base = f"http://127.0.0.1:{server_port}"
+
+    try:
+        results, wall, max_lag_ms = asyncio.run(replay(base, entries, args.speed, args.max_inflight))
+        hit_rates = _cache_hit_rates(base)
+        rss = bench._rss_kb(proc.pid) if proc else {}
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=10)
+            upstream.should_exit = True
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    span = entries[-1]["t"] - entries[0]["t"]
+    print(f"Replayed {len(entries)} requests ({span:.0f}s recorded) in {wall:.1f}s; max schedule lag {max_lag_ms:.0f} ms")
+    report = {"requests": len(entries), "recorded_s": span, "wall_s": round(wall, 2),
+              "max_lag_ms": round(max_lag_ms, 1), "routes": {}, "cache_hit_rate": hit_rates, "rss_kb": rss}
+    print(f"{'route':<20} {'count':>7} {'ttfb_p50':>9} {'ttfb_p99':>9} {'p50':>9} {'p99':>9}  status")
+    for path, r in sorted(results.items(), key=lambda kv: -sum(kv[1]["status"].values())):
+        row = {
+            "count": sum(r["status"].values()),
+            "ttfb_p50_ms": bench._round(bench._pct(r["ttfb"], 0.5)),
+            "ttfb_p99_ms": bench._round(bench._pct(r["ttfb"], 0.99)),
+            "p50_ms": bench._round(bench._pct(r["total"], 0.5)),
+            "p99_ms": bench._round(bench._pct(r["total"], 0.99)),
+            "status": dict(r["status"]),
+            "bytes": r["bytes"],
+        }
+        report["routes"][path] = row
+        print(f"{path:<20} {row['count']:>7} {str(row['ttfb_p50_ms']):>9} {str(row['ttfb_p99_ms']):>9} "
+              f"{str(row['p50_ms']):>9} {str(row['p99_ms']):>9}  {row['status']}")
+    if hit_rates:
+        print("cache hit rate: " + ", ".join(f"{ns} {rate:.0%}" for ns, rate in sorted(hit_rates.items())))
+    if rss:
+        print(f"server RSS {rss['VmRSS'] / 1024:.0f} MiB (peak {rss['VmHWM'] / 1024:.0f} MiB)")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,34 @@
 from fastapi import FastAPI, HTTPException, Request, Response, Query, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse, StreamingResponse
-from ytmusicapi import YTMusic
-import uvicorn
+from fastapi.responses import PlainTextResponse, RedirectResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import asyncio
+import contextlib
+import contextvars
 from concurrent.futures import ThreadPoolExecutor
 import time
 import logging
 import os
+import json
+import queue
+import sys
+import threading
+import unicodedata
+import urllib.parse
+from collections import OrderedDict, deque
 import httpx
 
+import cache_backend
+import extract_layers
+import local_index
+import lyrics_store
+import metrics
+import tracing
+import traffic_log
+import player_cipher
+import process_pool
+import stream_record
+
 # ── Deno PATH setup (installed by build.sh, needed for yt-dlp JS challenge solving) ──
 _home = os.path.expanduser("~")
 _deno_bin = os.path.join(_home, ".deno", "bin")
@@ -34,249 +53,471 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Optional sampled request log for replay.py (GROOVIA_TRAFFIC_LOG)
+traffic_log.install(app)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Metrics (served at /metrics)
+# ─────────────────────────────────────────────────────────────────────────────
+CACHE_REQUESTS = metrics.Counter("groovia_cache_requests_total", "Cache lookups", ("namespace", "result"))
+CACHE_EVICTIONS = metrics.Counter("groovia_cache_evictions_total", "Entries dropped on expiry or LRU overflow", ("namespace",))
+EXTRACT_SECONDS = extract_layers.EXTRACT_SECONDS  # defined next to the layers it times
+EXECUTOR_WAIT = metrics.Histogram("groovia_executor_wait_seconds", "Time a job waits for an executor thread")
+PROXY_ACTIVE = metrics.Gauge("groovia_proxy_streams_active", "Proxy streams currently open", ("route",))
+PROXY_BYTES = metrics.Counter("groovia_proxy_bytes_total", "Bytes proxied to clients", ("route",))
+UPSTREAM_STATUS = metrics.Counter("groovia_upstream_responses_total", "googlevideo responses by status", ("route", "status"))
+
+
+class _InstrumentedExecutor(ThreadPoolExecutor):
+    """
+    ThreadPoolExecutor that records how long each job waited in the queue and
+    runs it in the submitter's contextvars context, so tracing spans follow it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.active = 0
+        self.recent_wait = 0.0  # EWMA of queue wait, seconds
+        self._active_lock = threading.Lock()
+
+    def _track(self, delta: int) -> None:
+        with self._active_lock:
+            self.active += delta
+
+    def submit(self, fn, *args, **kwargs):
+        queued_at = time.perf_counter()
+        queued_ns = time.time_ns()
+        ctx = contextvars.copy_context()
+
+        def run():
+            waited = time.perf_counter() - queued_at
+            EXECUTOR_WAIT.observe(waited)
+            self.recent_wait = 0.8 * self.recent_wait + 0.2 * waited
+            ctx.run(tracing.record, "executor.queue", queued_ns, time.time_ns(), job=getattr(fn, "__name__", "?"))
+            self._track(1)
+            try:
+                return ctx.run(fn, *args, **kwargs)
+            finally:
+                self._track(-1)
+
+        return super().submit(run)
+
+
 # Thread pool — blocking calls (ytmusicapi, yt-dlp)
-executor = ThreadPoolExecutor(max_workers=12)
+executor = _InstrumentedExecutor(max_workers=12)
 
-# Initialize YTMusic (unauthenticated — public data)
-yt = YTMusic()
+metrics.Gauge("groovia_executor_queue_depth", "Jobs waiting for an executor thread", fn=lambda: executor._work_queue.qsize())
+metrics.Gauge("groovia_executor_active", "Executor threads running a job", fn=lambda: executor.active)
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Simple in-memory TTL cache
+# Admission control — refuse new executor work once the queue is backed up,
+# instead of letting every request's latency grow. Cache hits never get here.
+# Speculative work (/prefetch, lyrics warm-up) is shed first, and one client
+# can hold at most CLIENT_MAX_INFLIGHT executor jobs at a time.
 # ─────────────────────────────────────────────────────────────────────────────
-_cache: dict = {}
-_cache_ts: dict = {}
+ADMIT_MAX_QUEUE = int(os.environ.get("GROOVIA_ADMIT_MAX_QUEUE", "24"))
+ADMIT_MAX_WAIT = float(os.environ.get("GROOVIA_ADMIT_MAX_WAIT", "3"))
+PREFETCH_BATCH_MAX = 20
+PREFETCH_BATCH_PARALLEL = 2  # executor jobs one admitted batch may run at once
+PREFETCH_MAX_QUEUE = int(os.environ.get("GROOVIA_PREFETCH_MAX_QUEUE", "2"))
+PREFETCH_MAX_WAIT = 0.5
+CLIENT_MAX_INFLIGHT = int(os.environ.get("GROOVIA_CLIENT_MAX_INFLIGHT", "4"))
+RETRY_AFTER = 2
 
-def cache_get(key: str):
-    if key in _cache:
-        ttl = _cache_ts[key].get("ttl", 1800)
-        if time.time() - _cache_ts[key]["t"] < ttl:
-            return _cache[key]
-    return None
+ADMISSION_REJECTED = metrics.Counter("groovia_admission_rejected_total", "Requests refused by admission control", ("kind", "reason"))
 
-def cache_set(key: str, value, ttl: int = 1800):
-    _cache[key] = value
-    _cache_ts[key] = {"t": time.time(), "ttl": ttl}
+_client_ctx: contextvars.ContextVar = contextvars.ContextVar("groovia_client", default=None)
+_client_inflight: dict = {}  # client → executor jobs held (event loop only)
+
+
+class _ClientContext:
+    """Remembers who is calling: the address Render's proxy appends to X-Forwarded-For.
+
+    Earlier hops come from the client and can be forged, so only the last one is trusted.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            forwarded = dict(scope["headers"]).get(b"x-forwarded-for", b"").decode().split(",")[-1].strip()
+            _client_ctx.set(forwarded or (scope.get("client") or ("?",))[0])
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(_ClientContext)
+
+
+@contextlib.asynccontextmanager
+async def _admitted(kind: str):
+    """Hold an admission slot for executor work, or raise 503/429 with Retry-After."""
+    depth = executor._work_queue.qsize()
+    wait = executor.recent_wait if depth else 0.0
+    max_queue, max_wait = (PREFETCH_MAX_QUEUE, PREFETCH_MAX_WAIT) if kind == "prefetch" else (ADMIT_MAX_QUEUE, ADMIT_MAX_WAIT)
+    if depth >= max_queue or wait >= max_wait:
+        ADMISSION_REJECTED.inc(kind, "saturated")
+        raise HTTPException(status_code=503, detail="Server busy, retry shortly", headers={"Retry-After": str(RETRY_AFTER)})
+
+    client = _client_ctx.get()
+    if client is not None:
+        if _client_inflight.get(client, 0) >= CLIENT_MAX_INFLIGHT:
+            ADMISSION_REJECTED.inc(kind, "client_limit")
+            raise HTTPException(status_code=429, detail="Too many concurrent requests", headers={"Retry-After": "1"})
+        _client_inflight[client] = _client_inflight.get(client, 0) + 1
+    try:
+        yield
+    finally:
+        if client is not None:
+            remaining = _client_inflight.get(client, 1) - 1
+            if remaining:
+                _client_inflight[client] = remaining
+            else:
+                _client_inflight.pop(client, None)
+
+
+async def _offload(kind: str, fn, *args):
+    """run_in_executor behind admission control."""
+    async with _admitted(kind):
+        return await asyncio.get_event_loop().run_in_executor(executor, fn, *args)
+
+
+# The loop only keeps weak references to tasks: background work is held here until done
+_background_tasks: set = set()
+
+
+def _spawn(coro) -> asyncio.Task:
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+# ytmusicapi is imported and YTMusic built on first use (or by the startup warm-up
+# once the port is bound), not at import time — see coldstart.py.
+_yt_instance = None
+_yt_lock = threading.Lock()
+
+
+def _build_ytmusic():
+    from ytmusicapi import YTMusic
+
+    class _RecordingYTMusic(YTMusic):
+        """
+        YTMusic that can hand back the raw InnerTube responses of the calling thread.
+        Used to read continuation tokens that the public parsers drop.
+        """
+        _local = threading.local()
+
+        def _send_request(self, endpoint: str, body: dict, additionalParams: str = "") -> dict:
+            response = super()._send_request(endpoint, body, additionalParams)
+            recorded = getattr(self._local, "responses", None)
+            if recorded is not None:
+                recorded.append(response)
+            return response
+
+    # Unauthenticated — public data
+    return _RecordingYTMusic()
 
 
+def _get_yt():
+    global _yt_instance
+    if _yt_instance is None:
+        with _yt_lock:
+            if _yt_instance is None:
+                with tracing.span("ytmusic.init", shared=True):
+                    _yt_instance = _build_ytmusic()
+    return _yt_instance
+
+
+class _LazyYTMusic:
+    """Stands in for the shared YTMusic until something first touches it."""
+
+    def __getattr__(self, name):
+        return getattr(_get_yt(), name)
+
+
+yt = _LazyYTMusic()
+
 # ─────────────────────────────────────────────────────────────────────────────
-# yt-dlp URL extraction with in-memory cache (~1hr TTL)
+# TTL cache — in-process by default, shared across workers with
+# GROOVIA_CACHE_BACKEND=sqlite|redis (see cache_backend.py)
 # ─────────────────────────────────────────────────────────────────────────────
-_stream_cache: dict = {}
+_cache = cache_backend.from_env()
+_cache.on_evict = lambda key: CACHE_EVICTIONS.inc(metrics.namespace(key))
+
+def cache_get(key: str, count: bool = True):
+    """count=False for secondary lookups, so each request records one hit or miss."""
+    try:
+        value = _cache.get(key)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        value = None
+    if count:
+        CACHE_REQUESTS.inc(metrics.namespace(key), "miss" if value is None else "hit")
+    return value
+
+def cache_set(key: str, value, ttl: int = 1800):
+    try:
+        _cache.set(key, value, ttl)
+    except Exception as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
+
+
+_cache_is_local = isinstance(_cache, cache_backend.MemoryBackend)
+
+
+async def _cache_io(fn, *args):
+    """Cache calls from async code: inline for the memory backend, off the event loop for sqlite/redis."""
+    if _cache_is_local:
+        return fn(*args)
+    return await run_in_threadpool(fn, *args)
+
+
+# In-flight executor jobs keyed by cache key, so concurrent callers share one upstream call
+_inflight: dict = {}
+
+
+async def _run_once(key: str, fn, *args, kind: str = "metadata"):
+    """
+    Run fn(*args) on the executor, joining an identical job that is already in flight.
+    Joining is free; only a new job goes through admission control.
+    """
+    pending = _inflight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    future = asyncio.ensure_future(_offload(kind, fn, *args))
+    _inflight[key] = future
+    try:
+        return await asyncio.shield(future)
+    finally:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Cookies Setup for Cloud Deployment (Render bot bypass)
+# Local full-text index — every upstream response is ingested in the background
+# by a single writer thread fed from a bounded queue, so ingestion never takes
+# executor threads (or inflates the queue depth admission control watches).
+# When the writer falls behind, new responses are dropped rather than queued.
 # ─────────────────────────────────────────────────────────────────────────────
-cookies_b64 = os.environ.get("YT_COOKIES_B64")
-import base64
+LOCAL_SEARCH_MIN_HITS = 5
+INDEX_QUEUE_MAX = 200
 
-def _setup_cookies():
-    # 1. First try Env Var (Fastest)
-    if cookies_b64:
+INDEX_DROPPED = metrics.Counter("groovia_index_dropped_total", "Responses not indexed because the writer queue was full")
+_index_queue: queue.Queue = queue.Queue(maxsize=INDEX_QUEUE_MAX)
+_index_writer = None
+_index_writer_lock = threading.Lock()
+metrics.Gauge("groovia_index_queue_depth", "Responses waiting for the local index writer", fn=lambda: _index_queue.qsize())
+
+
+def _index_writer_loop():
+    while True:
+        results = _index_queue.get()
         try:
-            cookies_txt = base64.b64decode(cookies_b64).decode("utf-8")
-            with open("cookies.txt", "w") as f:
-                f.write(cookies_txt)
-            logger.info("🍪 Decoded YT_COOKIES_B64 from ENV and generated cookies.txt for bot bypass.")
-            return
+            local_index.ingest(results)
         except Exception as e:
-            logger.error(f"❌ Failed to decode ENV cookies: {e}")
-
-    # 2. Try looking for the raw or b64 file in the filesystem
-    potential_paths = [
-        "cookies_b64_for_render.txt", 
-        "../cookies_b64_for_render.txt",
-        "cookies.txt"
-    ]
-    
-    for path in potential_paths:
-        if os.path.exists(path):
-            if path.endswith("cookies.txt"):
-                logger.info("🍪 Found existing cookies.txt directly in filesystem.")
-                return
-            else:
-                try:
-                    with open(path, "r") as f:
-                        b64_content = f.read().strip()
-                    cookies_txt = base64.b64decode(b64_content).decode("utf-8")
-                    with open("cookies.txt", "w") as f:
-                        f.write(cookies_txt)
-                    logger.info(f"🍪 Decoded '{path}' and generated cookies.txt for bot bypass.")
-                    return
-                except Exception as e:
-                    logger.error(f"❌ Failed to decode file {path}: {e}")
-                    
-    logger.warning("⚠️ NO COOKIES FOUND: yt-dlp will run unauthenticated and might get blocked by YouTube on Datacenter IPs!")
-
-_setup_cookies()
-
-def _parse_netscape_cookies(filepath: str) -> dict:
-    """Parse a Netscape cookies.txt file into a name→value dict."""
-    cookies = {}
+            logger.warning(f"Local index ingest failed: {e}")
+
+
+def _index_later(results):
+    """Queue an upstream response for local indexing without delaying the request."""
+    global _index_writer
+    if _index_writer is None:
+        with _index_writer_lock:
+            if _index_writer is None:
+                _index_writer = threading.Thread(target=_index_writer_loop, name="local-index-writer", daemon=True)
+                _index_writer.start()
     try:
-        with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                parts = line.split("\t")
-                if len(parts) >= 7:
-                    cookies[parts[5]] = parts[6]
-    except Exception:
-        pass
-    return cookies
-
-
-def _make_sapisidhash(sapisid: str, origin: str = "https://www.youtube.com") -> str:
-    """Generate YouTube SAPISIDHASH authorization header value."""
-    import hashlib
-    ts = int(time.time())
-    h = hashlib.sha1(f"{ts} {sapisid} {origin}".encode()).hexdigest()
-    return f"SAPISIDHASH {ts}_{h}"
-
-
-def _innertube_extract(video_id: str) -> dict | None:
+        _index_queue.put_nowait(results)
+    except queue.Full:
+        INDEX_DROPPED.inc()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Stream URL cache (~50 min TTL) — entries live in the same backend under
+# "stream:{videoId}"; a cold extraction holds "lock:stream:{videoId}" so other
+# workers wait for its result instead of extracting the same video again.
+# ─────────────────────────────────────────────────────────────────────────────
+STREAM_CACHE_TTL = extract_layers.STREAM_CACHE_TTL
+STREAM_LOCK_TTL = 45
+
+# Negative cache: "dead:{videoId}" → {"reason", "failures", "retry_at"}. After all
+# layers fail, the ID is refused cheaply until retry_at; each further failure
+# doubles the wait up to NEGATIVE_MAX_TTL. The failure count is forgotten after
+# NEGATIVE_FORGET without another failure.
+NEGATIVE_TTL = int(os.environ.get("GROOVIA_NEGATIVE_TTL", "30"))
+NEGATIVE_MAX_TTL = int(os.environ.get("GROOVIA_NEGATIVE_MAX_TTL", "3600"))
+NEGATIVE_FORGET = 6 * 3600
+
+# Optional: run the extraction layers in worker processes (GROOVIA_EXTRACT_PROCESSES)
+_extract_pool = process_pool.from_env(warm_modules=("extract_layers", "pytubefix"))
+
+
+def _extract_stream_url(video_id: str) -> dict:
     """
-    Call YouTube InnerTube API via ytmusicapi with full authentication from cookies.txt.
-    Works from ANY IP (including Render datacenter) when valid auth cookies present.
+    Cached, cross-worker single-flight wrapper around extract_layers.extract.
     """
-    cookies = _parse_netscape_cookies("cookies.txt") if os.path.exists("cookies.txt") else {}
-    
-    headers = None
-    if cookies:
-        cookie_str = "; ".join(f"{k}={v}" for k, v in cookies.items())
-        sapisid = cookies.get("SAPISID") or cookies.get("__Secure-3PAPISID") or cookies.get("__Secure-1PAPISID")
-        if sapisid:
-            import hashlib
-            ts = int(time.time())
-            h = hashlib.sha1(f"{ts} {sapisid} https://music.youtube.com".encode()).hexdigest()
-            auth = f"SAPISIDHASH {ts}_{h}"
-            headers = {"Cookie": cookie_str, "Authorization": auth}
+    cache_key = f"stream:{video_id}"
+    with tracing.span("cache.lookup") as attrs:
+        # Re-check only: callers have already counted their own lookup (_cached_stream)
+        cached = cache_get(cache_key, count=False)
+        attrs["hit"] = bool(cached and cached.get("expires_at", 0) > time.time())
+    if attrs["hit"]:
+        logger.info(f"✅ Stream cache hit: {video_id}")
+        return cached
 
+    lock_key = f"lock:{cache_key}"
     try:
-        if headers:
-            yt = YTMusic(auth=headers)
-        else:
-            yt = YTMusic()
-            
-        data = yt.get_song(video_id)
+        owns_lock = _cache.acquire(lock_key, STREAM_LOCK_TTL)
     except Exception as e:
-        logger.warning(f"InnerTube request failed: {e}")
-        return None
+        logger.warning(f"Stream lock unavailable for {video_id}: {e}")
+        owns_lock = False
+    else:
+        if not owns_lock:
+            with tracing.span("extract.wait_inflight"):
+                waited = cache_backend.wait_for(_cache, cache_key, lock_key, STREAM_LOCK_TTL)
+            if waited:
+                logger.info(f"✅ Stream joined in-flight extraction: {video_id}")
+                return waited
+
+    t0 = time.perf_counter()
+    outcome = "fail"
+    try:
+        if _extract_pool:
+            with tracing.span("extract.process_pool"):
+                cache_data = _extract_pool.run(extract_layers.extract, video_id)
+        else:
+            cache_data = extract_layers.extract(video_id)
+        outcome = "ok"
+        return _cache_stream(video_id, cache_data)
+    finally:
+        # "all" covers the local layers, including work done in worker processes
+        EXTRACT_SECONDS.observe(time.perf_counter() - t0, "all", outcome)
+        if owns_lock:
+            _cache.release(lock_key)
 
-    playability = data.get("playabilityStatus", {})
-    status = playability.get("status")
-    if status not in ("OK", None):
-        reason = playability.get("reason", "unknown")
-        logger.warning(f"InnerTube playability [{status}] for {video_id}: {reason}")
-        return None
 
-    streaming_data = data.get("streamingData", {})
-    formats = streaming_data.get("adaptiveFormats", []) + streaming_data.get("formats", [])
+def _cache_stream(video_id: str, cache_data: dict):
+    """Store an extracted stream (compactly, with the memory backend) and return what was stored."""
+    if isinstance(_cache, cache_backend.MemoryBackend):
+        cache_data = stream_record.StreamRecord.from_dict(cache_data)
+    cache_set(f"stream:{video_id}", cache_data, ttl=STREAM_CACHE_TTL)
+    return cache_data
 
-    audio_formats = [
-        f for f in formats
-        if f.get("mimeType", "").startswith("audio") and f.get("url")
-    ]
 
-    if not audio_formats:
-        logger.warning(f"InnerTube: no direct audio URLs for {video_id} (may need signature decryption)")
-        return None
+# ─────────────────────────────────────────────────────────────────────────────
+# LAYER 2: Vercel Scraper API (YOUTUBE_SCRAPER, no bot detection)
+# Called from the event loop over one keep-alive client, so a slow cold start
+# holds no executor thread; a short connect timeout plus an overall deadline
+# bound each call. Several IDs resolve in one round trip via /audio/batch.
+# ─────────────────────────────────────────────────────────────────────────────
+SCRAPER_URL = os.environ.get("GROOVIA_SCRAPER_URL", "https://grooviaytmusic.vercel.app").rstrip("/")
+SCRAPER_CONNECT_TIMEOUT = float(os.environ.get("GROOVIA_SCRAPER_CONNECT_TIMEOUT", "2"))
+SCRAPER_DEADLINE = float(os.environ.get("GROOVIA_SCRAPER_DEADLINE", "8"))
+SCRAPER_BATCH_MAX = 10  # the scraper's own /audio/batch limit
 
-    m4a = [f for f in audio_formats if "mp4" in f.get("mimeType", "")]
-    chosen = sorted(m4a or audio_formats, key=lambda f: f.get("averageBitrate", f.get("bitrate", 0)), reverse=True)[0]
+_scraper_client = None
 
-    stream_url = chosen["url"]
-    mime = chosen.get("mimeType", "audio/webm")
-    ext = "m4a" if "mp4" in mime else "webm"
-    title = data.get("videoDetails", {}).get("title", video_id)
 
-    logger.info(f"🎵 InnerTube SUCCESS for {video_id} [{ext}] @ {chosen.get('averageBitrate', '?')}bps")
+def _get_scraper_client() -> httpx.AsyncClient:
+    global _scraper_client
+    if _scraper_client is None:
+        _scraper_client = httpx.AsyncClient(
+            base_url=SCRAPER_URL,
+            timeout=httpx.Timeout(SCRAPER_DEADLINE, connect=SCRAPER_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120),
+            follow_redirects=True,
+        )
+    return _scraper_client
+
+
+def _scraper_stream(video_id: str, stream: dict) -> dict | None:
+    """A scraper /audio stream → the fields extract_layers.extract returns."""
+    if not stream or not stream.get("url"):
+        return None
+    ext = stream.get("mimeType", "webm").split("/")[-1]
     return {
-        "url": stream_url,
-        "ext": ext,
-        "http_headers": {"User-Agent": "Mozilla/5.0"},
-        "title": title,
+        "url": stream["url"], "ext": "m4a" if ext == "mp4" else ext,
+        "http_headers": {"User-Agent": "Mozilla/5.0"}, "title": stream.get("title", video_id),
+        "expires_at": time.time() + STREAM_CACHE_TTL,
     }
 
 
-def _extract_stream_url(video_id: str) -> dict:
-    """
-    Audio URL extraction - 3 layers:
-    LAYER 0 (PRIMARY): YouTube InnerTube API (ytmusicapi.get_song)
-    LAYER 1: pytubefix (local fallback)
-    LAYER 2: Vercel Scraper API (remote fallback - no bot detection)
-    """
-    cached = _stream_cache.get(video_id)
-    if cached and cached.get("expires_at", 0) > time.time():
-        logger.info(f"✅ Stream cache hit: {video_id}")
-        return cached
+async def _scraper_get(path: str, params: dict, deadline: float):
+    with tracing.span("layer.vercel", path=path) as attrs:
+        resp = await asyncio.wait_for(_get_scraper_client().get(path, params=params), deadline)
+        attrs["status"] = resp.status_code
+    return resp
 
-    url = None
-    ext = "webm"
-    http_headers = {"User-Agent": "Mozilla/5.0"}
-    title_res = video_id
 
-    # ── LAYER 0: InnerTube direct API ────────────────────────────────────────
+async def _scraper_resolve(video_id: str) -> dict | None:
+    t0 = time.perf_counter()
+    result = None
     try:
-        logger.info(f"🔍 Layer 0: InnerTube API for {video_id}...")
-        result = _innertube_extract(video_id)
-        if result:
-            url = result["url"]
-            ext = result["ext"]
-            http_headers = result["http_headers"]
-            title_res = result["title"]
-            logger.info(f"🎵 Layer 0 InnerTube SUCCESS for {video_id} [{ext}]")
+        logger.info(f"🔍 Layer 2: Vercel Scraper for {video_id}...")
+        resp = await _scraper_get(f"/audio/{video_id}", {"quality": "high"}, SCRAPER_DEADLINE)
+        if resp.status_code == 200:
+            data = resp.json()
+            if data.get("success"):
+                result = _scraper_stream(video_id, data.get("data"))
     except Exception as e:
-        logger.warning(f"⚠️ Layer 0 (InnerTube) failed: {str(e)[:120]}")
-
-    # ── LAYER 1: pytubefix ────────────────────────────────────────────────────
-    if not url:
+        logger.warning(f"⚠️ Layer 2 Vercel Scraper failed: {type(e).__name__} {str(e)[:100]}")
+    EXTRACT_SECONDS.observe(time.perf_counter() - t0, "vercel", "ok" if result else "fail")
+    if result:
+        logger.info(f"🎵 Layer 2 Vercel Scraper SUCCESS for {video_id}")
+    return result
+
+
+async def _scraper_resolve_many(video_ids: list) -> dict:
+    """videoId → stream fields (or None), SCRAPER_BATCH_MAX IDs per round trip."""
+    results = {}
+    for i in range(0, len(video_ids), SCRAPER_BATCH_MAX):
+        chunk = video_ids[i:i + SCRAPER_BATCH_MAX]
+        t0 = time.perf_counter()
         try:
-            logger.info(f"🔍 Layer 1: pytubefix for {video_id}...")
-            from pytubefix import YouTube
-            yt = YouTube(f"https://music.youtube.com/watch?v={video_id}", use_oauth=False, allow_oauth_cache=False)
-            audio_streams = yt.streams.filter(only_audio=True).order_by('abr').desc()
-            if audio_streams:
-                best_audio = audio_streams[0]
-                url = best_audio.url
-                ext = "m4a" if "mp4" in best_audio.mime_type else "webm"
-                http_headers = {"User-Agent": "Mozilla/5.0"}
-                title_res = yt.title or video_id
-                logger.info(f"🎵 Layer 1 pytubefix SUCCESS for {video_id}")
+            # The scraper resolves a batch concurrently, a few IDs at a time
+            resp = await _scraper_get("/audio/batch", {"ids": ",".join(chunk), "quality": "high"}, 2 * SCRAPER_DEADLINE)
+            data = resp.json().get("data") if resp.status_code == 200 else None
         except Exception as e:
-            logger.warning(f"⚠️ Layer 1 pytubefix failed: {str(e)[:100]}")
+            logger.warning(f"⚠️ Layer 2 batch failed: {type(e).__name__} {str(e)[:100]}")
+            data = None
+        if data is None:
+            # Batch call failed, or scraper deployed without /audio/batch — one call per ID
+            streams = await asyncio.gather(*(_scraper_resolve(v) for v in chunk))
+            results.update(zip(chunk, streams))
+            continue
+        elapsed = time.perf_counter() - t0
+        for video_id in chunk:
+            results[video_id] = _scraper_stream(video_id, data.get(video_id))
+            EXTRACT_SECONDS.observe(elapsed, "vercel", "ok" if results[video_id] else "fail")
+    return results
+
+
+@app.on_event("startup")
+async def _warm_extract_pool():
+    if _extract_pool:
+        asyncio.get_event_loop().run_in_executor(executor, _extract_pool.warm)
+
+
+def _warm_up():
+    """Build what the first request would otherwise pay for: cookies, YTMusic, the visitor id."""
+    start = time.perf_counter()
+    try:
+        extract_layers.ensure_cookies()
+        _get_yt().base_headers  # fetches the visitor id
+        import pytubefix  # noqa: F401 — Layer 1's import
+        player_cipher.warm()
+    except Exception as e:
+        logger.warning(f"Warm-up incomplete: {e}")
+    logger.info(f"🔥 Warm-up done in {(time.perf_counter() - start) * 1000:.0f} ms")
 
-    # ── LAYER 2: Vercel Scraper API (no bot detection) ─────────────────────────
-    if not url:
-        try:
-            logger.info(f"🔍 Layer 2: Vercel Scraper for {video_id}...")
-            scraper_url = f"https://grooviaytmusic.vercel.app/audio/{video_id}?quality=high"
-            resp = httpx.get(scraper_url, timeout=15, follow_redirects=True)
-            if resp.status_code == 200:
-                data = resp.json()
-                if data.get("success") and data.get("data", {}).get("url"):
-                    url = data["data"]["url"]
-                    ext = data["data"].get("mimeType", "webm").split("/")[-1]
-                    if ext == "webm":
-                        ext = "webm"
-                    elif ext == "mp4":
-                        ext = "m4a"
-                    http_headers = {"User-Agent": "Mozilla/5.0"}
-                    title_res = data["data"].get("title", video_id)
-                    logger.info(f"🎵 Layer 2 Vercel Scraper SUCCESS for {video_id}")
-        except Exception as e:
-            logger.warning(f"⚠️ Layer 2 Vercel Scraper failed: {str(e)[:100]}")
 
-    if url:
-        cache_data = {
-            "url": url, "ext": ext,
-            "http_headers": http_headers, "title": title_res,
-            "expires_at": time.time() + 3000
-        }
-        _stream_cache[video_id] = cache_data
-        return cache_data
+@app.on_event("startup")
+async def _schedule_warm_up():
+    # Uvicorn binds the port only after startup hooks return, so this is not awaited
+    if os.environ.get("GROOVIA_WARM_UP", "1") != "0":
+        asyncio.get_event_loop().run_in_executor(executor, _warm_up)
 
-    raise ValueError(f"All 3 layers exhausted for {video_id}. No working stream found.")
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Root
@@ -286,41 +527,189 @@ def read_root():
     return {"message": "Groovia YTMusic API v2 is running", "status": "healthy"}
 
 
+@app.get("/metrics")
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/debug/traces")
+def get_traces(limit: int = 20):
+    """Most recent slow (or sampled) request traces, newest first."""
+    return {"slow_ms": tracing.SLOW_MS, "sample_rate": tracing.SAMPLE_RATE, "traces": tracing.recent(limit)}
+
+
+def _size_caches(entries: list, suggest: dict, primed: dict) -> dict:
+    caches = {}
+    seen: dict = {}
+    for key, value, _ in entries:
+        ns = metrics.namespace(key)
+        row = caches.setdefault(ns, {"entries": 0, "bytes": 0})
+        row["entries"] += 1
+        row["bytes"] += sys.getsizeof(key) + metrics.sizeof(value, seen.setdefault(ns, set()))
+    caches["suggest_lru"] = {"entries": len(suggest), "bytes": metrics.sizeof(suggest)}
+    caches["primed_audio"] = {"entries": len(primed), "bytes": metrics.sizeof(primed)}
+    return caches
+
+
+@app.get("/debug/memory")
+async def get_memory():
+    """
+    Approximate bytes held per in-process cache (deep size; objects shared within
+    a cache, like interned stream headers, are counted once). Walks every entry.
+    """
+    # Snapshot on the loop, which owns _primed and _suggest_cache; the deep walk runs off it
+    entries = _cache.snapshot() if isinstance(_cache, cache_backend.MemoryBackend) else []
+    caches = await run_in_threadpool(_size_caches, entries, dict(_suggest_cache), dict(_primed))
+
+    rss_kb = None
+    with contextlib.suppress(OSError):
+        with open("/proc/self/status") as f:
+            rss_kb = next((int(line.split()[1]) for line in f if line.startswith("VmRSS:")), None)
+    return {
+        "backend": _cache.name,
+        "caches": caches,
+        "total_bytes": sum(row["bytes"] for row in caches.values()),
+        "shared_header_sets": stream_record.shared_header_sets(),
+        "rss_kb": rss_kb,
+    }
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # /search
 # ─────────────────────────────────────────────────────────────────────────────
+def _normalize_query(query: str) -> str:
+    """NFKC + casefold + collapsed whitespace, so trivially different queries share one key."""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
 @app.get("/search")
-async def search(query: str, filter: str = None, limit: int = 20):
-    cache_key = f"search:{query}:{filter}:{limit}"
-    cached = cache_get(cache_key)
+async def search(query: str, filter: str = None, limit: int = 20, local: bool = False):
+    cache_key = f"search:{_normalize_query(query)}:{filter}:{limit}"
+    cached = await _cache_io(cache_get, cache_key)
     if cached is not None:
         return {"data": cached, "cached": True}
+
+    # Local first, upstream fallback
+    if local:
+        hits = await run_in_threadpool(local_index.search, query, filter=filter, limit=limit)
+        if len(hits) >= min(limit, LOCAL_SEARCH_MIN_HITS):
+            return {"data": hits, "source": "local"}
+
     try:
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(
-            executor,
-            lambda: yt.search(query, filter=filter, limit=limit)
-        )
-        cache_set(cache_key, results, ttl=1800)
+        results = await _offload("metadata", lambda: yt.search(query, filter=filter, limit=limit))
+        await _cache_io(cache_set, cache_key, results, 1800)
+        _index_later(results)
+        return {"data": results}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# /suggestions — search-as-you-type, backed by a prefix LRU
+# A longer prefix is answered from the longest cached shorter prefix when enough
+# of its suggestions still match; otherwise one upstream call is made.
+# ─────────────────────────────────────────────────────────────────────────────
+SUGGEST_CACHE_SIZE = 5000
+SUGGEST_TTL = 3600
+SUGGEST_MIN_LOCAL = 3
+
+_suggest_cache: OrderedDict = OrderedDict()  # normalized prefix → (suggestions, stored_at)
+
+
+def _suggest_get(prefix: str):
+    entry = _suggest_cache.get(prefix)
+    if entry is None:
+        return None
+    suggestions, stored_at = entry
+    if time.time() - stored_at >= SUGGEST_TTL:
+        if _suggest_cache.pop(prefix, None) is not None:
+            CACHE_EVICTIONS.inc("suggest")
+        return None
+    _suggest_cache.move_to_end(prefix)
+    return suggestions
+
+
+def _suggest_set(prefix: str, suggestions: list):
+    _suggest_cache[prefix] = (suggestions, time.time())
+    _suggest_cache.move_to_end(prefix)
+    while len(_suggest_cache) > SUGGEST_CACHE_SIZE:
+        _suggest_cache.popitem(last=False)
+        CACHE_EVICTIONS.inc("suggest")
+
+
+def _suggest_from_shorter(prefix: str):
+    """Answer `prefix` by filtering the longest cached shorter prefix, if it has enough matches."""
+    for n in range(len(prefix) - 1, 0, -1):
+        shorter = _suggest_get(prefix[:n])
+        if shorter is None:
+            continue
+        matches = [s for s in shorter if _normalize_query(s).startswith(prefix)]
+        if len(matches) >= SUGGEST_MIN_LOCAL:
+            return matches
+        return None
+    return None
+
+
+@app.get("/suggestions")
+async def search_suggestions(query: str):
+    prefix = _normalize_query(query)
+    if not prefix:
+        return {"data": []}
+
+    cached = _suggest_get(prefix)
+    if cached is not None:
+        CACHE_REQUESTS.inc("suggest", "hit")
+        return {"data": cached, "cached": True}
+
+    local = _suggest_from_shorter(prefix)
+    CACHE_REQUESTS.inc("suggest", "miss" if local is None else "hit")
+    if local is not None:
+        _suggest_set(prefix, local)
+        return {"data": local, "cached": True}
+
+    try:
+        results = await _offload("metadata", lambda: yt.get_search_suggestions(prefix))
+        _suggest_set(prefix, results)
         return {"data": results}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# /local/search — answered from the local index only, no upstream call
+# ─────────────────────────────────────────────────────────────────────────────
+@app.get("/local/search")
+def local_search(query: str, filter: str = None, limit: int = 20):
+    return {"data": local_index.search(query, filter=filter, limit=limit), "source": "local"}
+
+
+@app.get("/local/stats")
+def local_stats():
+    return {"data": local_index.stats()}
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # /watch
 # ─────────────────────────────────────────────────────────────────────────────
 @app.get("/watch")
 async def get_watch_playlist(videoId: str):
     cache_key = f"watch:{videoId}"
-    cached = cache_get(cache_key)
+    cached = await _cache_io(cache_get, cache_key)
     if cached is not None:
         return {"data": cached, "cached": True}
     try:
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(executor, lambda: yt.get_watch_playlist(videoId=videoId))
-        cache_set(cache_key, results, ttl=600)
+        results = await _offload("metadata", lambda: yt.get_watch_playlist(videoId=videoId))
+        await _cache_io(cache_set, cache_key, results, 600)
+        _index_later(results)
+        if results.get("lyrics"):
+            _prefetch_lyrics(results["lyrics"])
         return {"data": results}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -331,33 +720,173 @@ async def get_watch_playlist(videoId: str):
 @app.get("/album")
 async def get_album(browseId: str):
     cache_key = f"album:{browseId}"
-    cached = cache_get(cache_key)
+    cached = await _cache_io(cache_get, cache_key)
     if cached is not None:
         return {"data": cached, "cached": True}
     try:
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(executor, lambda: yt.get_album(browseId=browseId))
-        cache_set(cache_key, results, ttl=3600)
+        results = await _offload("metadata", lambda: yt.get_album(browseId=browseId))
+        await _cache_io(cache_set, cache_key, results, 3600)
+        _index_later({**results, "browseId": browseId, "resultType": "album"})
         return {"data": results}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _cached_stream(video_id: str):
+    cached = cache_get(f"stream:{video_id}", count=False)
+    fresh = bool(cached and cached.get("expires_at", 0) > time.time())
+    CACHE_REQUESTS.inc("stream", "hit" if fresh else "miss")
+    return cached if fresh else None
+
+
+def _dead_stream(video_id: str):
+    """The negative cache entry for video_id, whether or not its backoff has passed."""
+    return cache_get(f"dead:{video_id}", count=False)
+
+
+def _unavailable(video_id: str, dead: dict) -> HTTPException:
+    retry_after = max(1, round(dead["retry_at"] - time.time()))
+    return HTTPException(
+        status_code=404,
+        detail=f"No playable stream for {video_id}: {dead['reason']}",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def _mark_dead(video_id: str, reason: str, previous: dict = None) -> dict:
+    failures = (previous or {}).get("failures", 0) + 1
+    backoff = min(NEGATIVE_TTL * 2 ** (failures - 1), NEGATIVE_MAX_TTL)
+    dead = {"reason": reason, "failures": failures, "retry_at": time.time() + backoff}
+    cache_set(f"dead:{video_id}", dead, ttl=NEGATIVE_FORGET)
+    logger.warning(f"💀 {video_id} unavailable ({reason}); refusing for {backoff}s after {failures} failure(s)")
+    return dead
+
+
+def _forget_dead(video_id: str) -> None:
+    with contextlib.suppress(Exception):
+        _cache.delete(f"dead:{video_id}")
+
+
+def _local_failure(video_id: str, e: Exception):
+    """Why layers 0/1 gave up; a pool timeout or crashed worker counts as a failure too, so Layer 2 runs."""
+    if isinstance(e, extract_layers.LocalLayersFailed):
+        return e.reason
+    logger.warning(f"⚠️ Local extraction error for {video_id}: {e}")
+    return f"local layers: {e}"[:200]
+
+
+async def _resolve_stream(video_id: str, kind: str) -> dict:
+    """
+    Stream URL for video_id. A cache hit is answered here, skipping admission and
+    the executor; the local layers run on the executor, the remote scraper here.
+    IDs whose layers all failed recently are refused with 404 + Retry-After.
+    """
+    cached = await _cache_io(_cached_stream, video_id)
+    if cached:
+        return cached
+    dead = await _cache_io(_dead_stream, video_id)
+    if dead and dead["retry_at"] > time.time():
+        raise _unavailable(video_id, dead)
+
+    reason = None
+    try:
+        result = await _offload(kind, _extract_stream_url, video_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        reason = _local_failure(video_id, e)
+        result = await _scraper_resolve(video_id)
+        if result:
+            result = await _cache_io(_cache_stream, video_id, result)
+    if not result:
+        dead = await _cache_io(_mark_dead, video_id, reason or "all 3 layers exhausted", dead)
+        raise _unavailable(video_id, dead)
+    if dead:
+        await _cache_io(_forget_dead, video_id)
+    return result
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # /prefetch — warm up URL cache before user presses play
+# Speculative, so it is the first thing refused (503 + Retry-After) under load.
 # ─────────────────────────────────────────────────────────────────────────────
 @app.get("/prefetch")
-async def prefetch(videoId: str):
-    """Pre-warms the stream URL cache silently in background."""
+async def prefetch(videoId: str, prime: bool = False):
+    """
+    Pre-warms the stream URL cache silently in background. With prime=true the
+    first PRIME_BYTES of audio are fetched too, so playback from 0 starts at once.
+    """
+    trace = tracing.start("GET /prefetch", videoId=videoId, prime=prime)
     try:
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(executor, _extract_stream_url, videoId)
+        data = await _resolve_stream(videoId, "prefetch")
+        if prime:
+            _spawn(_prime(videoId, data))
+        else:
+            _preconnect(data)
+        trace.finish()
         return {"status": "cached", "videoId": videoId}
+    except HTTPException as e:
+        trace.finish(status=e.status_code)
+        raise
     except Exception as e:
         logger.warning(f"Prefetch failed for {videoId}: {e}")
+        trace.finish(error=str(e)[:200])
         return {"status": "error", "detail": str(e)}
 
 
+@app.get("/prefetch/batch")
+async def prefetch_batch(videoIds: str):
+    """
+    Pre-warms several stream URLs (comma-separated, e.g. the next tracks in a queue).
+    The batch is admitted once and extracted PREFETCH_BATCH_PARALLEL IDs at a time;
+    IDs the local layers can't resolve share remote scraper round trips.
+    """
+    video_ids = list(dict.fromkeys(v.strip() for v in videoIds.split(",") if v.strip()))[:PREFETCH_BATCH_MAX]
+    statuses, reasons = {}, {}
+    for video_id in video_ids:
+        cached = await _cache_io(_cached_stream, video_id)
+        dead = None if cached else await _cache_io(_dead_stream, video_id)
+        if cached:
+            _preconnect(cached)
+            statuses[video_id] = "cached"
+        elif dead and dead["retry_at"] > time.time():
+            statuses[video_id] = "unavailable"
+    misses = [v for v in video_ids if v not in statuses]
+
+    loop = asyncio.get_event_loop()
+    parallel = asyncio.Semaphore(PREFETCH_BATCH_PARALLEL)
+
+    async def local(video_id: str) -> str:
+        async with parallel:
+            try:
+                _preconnect(await loop.run_in_executor(executor, _extract_stream_url, video_id))
+                return "cached"
+            except Exception as e:
+                reasons[video_id] = _local_failure(video_id, e)
+                return "remote"
+
+    # The whole batch takes one admission slot, like a single /prefetch
+    if misses:
+        try:
+            async with _admitted("prefetch"):
+                statuses.update(zip(misses, await asyncio.gather(*(local(v) for v in misses))))
+        except HTTPException:
+            statuses.update(dict.fromkeys(misses, "shed"))
+
+    remote = [v for v in misses if statuses[v] == "remote"]
+    if remote:
+        for video_id, result in (await _scraper_resolve_many(remote)).items():
+            if result:
+                _preconnect(await _cache_io(_cache_stream, video_id, result))
+            else:
+                previous = await _cache_io(_dead_stream, video_id)
+                await _cache_io(_mark_dead, video_id, reasons.get(video_id) or "all 3 layers exhausted", previous)
+            statuses[video_id] = "cached" if result else "unavailable"
+    return {"status": {v: statuses[v] for v in video_ids}}
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # /stream — Main audio streaming endpoint
 # Replaces pytubefix with yt-dlp for reliability
@@ -374,10 +903,12 @@ async def stream_audio(
     """
     Proxy-streams audio from YouTube.
     Forwards Content-Range + Content-Length for proper HTML5 audio seekability.
+    The trace ends at the first upstream byte; that is the latency a listener feels.
     """
+    trace = tracing.start("GET /stream", videoId=videoId, range=range or request_range)
     try:
-        loop = asyncio.get_event_loop()
-        data = await loop.run_in_executor(executor, _extract_stream_url, videoId)
+        with tracing.span("extract"):
+            data = await _resolve_stream(videoId, "stream")
         url = data["url"]
         http_headers = data.get("http_headers", {})
         ext = data.get("ext", "webm")
@@ -402,22 +933,24 @@ async def stream_audio(
         }
         content_type = content_type_map.get(ext, "audio/webm")
 
-        # Open the upstream request (non-streaming first to grab headers)
-        upstream_client = httpx.AsyncClient(timeout=60)
-        upstream_resp = await upstream_client.send(
-            upstream_client.build_request("GET", url, headers=req_headers),
-            stream=True,
-            follow_redirects=True,
-        )
+        primed = None if download else _take_primed(videoId, url, range_header)
+        if primed is not None:
+            return _primed_response(videoId, primed, range_header, req_headers, content_type, trace)
+
+        # Open the upstream request (non-streaming first to grab headers) on the shared
+        # pool, so a connection pre-opened by /prefetch (or a previous seek) is reused
+        upstream_client = _get_upstream_client()
+        with tracing.span("upstream.headers") as attrs:
+            upstream_resp = await upstream_client.send(
+                upstream_client.build_request("GET", url, headers=req_headers),
+                stream=True,
+                follow_redirects=True,
+            )
+            attrs["status"] = upstream_resp.status_code
+        headers_ns = time.time_ns()
 
         # Build response headers, forwarding critical ones from upstream
-        resp_headers = {
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "GET, OPTIONS",
-            "Access-Control-Allow-Headers": "*",
-            "Accept-Ranges": "bytes",
-            "Cache-Control": "no-cache",
-        }
+        resp_headers = dict(_STREAM_HEADERS)
         for h in ("Content-Length", "Content-Range", "Content-Type"):
             val = upstream_resp.headers.get(h)
             if val:
@@ -437,13 +970,21 @@ async def stream_audio(
             resp_headers["Access-Control-Expose-Headers"] = "Content-Disposition"
             status_code = 200
 
+        UPSTREAM_STATUS.inc("stream", upstream_resp.status_code)
+
         async def proxy_stream():
+            PROXY_ACTIVE.inc("stream")
             try:
                 async for chunk in upstream_resp.aiter_bytes(chunk_size=65536):
+                    if trace.end_ns is None:
+                        trace.add("upstream.first_byte", headers_ns, time.time_ns())
+                        trace.finish(status=status_code)
+                    PROXY_BYTES.inc("stream", amount=len(chunk))
                     yield chunk
             finally:
+                trace.finish(status=status_code)
+                PROXY_ACTIVE.dec("stream")
                 await upstream_resp.aclose()
-                await upstream_client.aclose()
 
         logger.info(f"🎧 Streaming {videoId} [{ext}] status={status_code} range={range_header}")
         return StreamingResponse(
@@ -454,12 +995,271 @@ async def stream_audio(
         )
 
     except HTTPException:
+        trace.finish()
         raise
     except Exception as e:
         logger.error(f"❌ Stream failed for {videoId}: {e}")
+        trace.finish(error=str(e)[:200])
         raise HTTPException(status_code=500, detail=str(e))
 
 
+_STREAM_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, OPTIONS",
+    "Access-Control-Allow-Headers": "*",
+    "Accept-Ranges": "bytes",
+    "Cache-Control": "no-cache",
+}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Primed first bytes
+# /prefetch?prime=true fetches the first PRIME_BYTES of the chosen format (the
+# container header and init segment are at the front) into a bounded LRU. A
+# /stream Range from byte 0 then sends those bytes at once while the rest of
+# the range is opened upstream, instead of waiting a round trip for the first.
+# ─────────────────────────────────────────────────────────────────────────────
+PRIME_BYTES = int(os.environ.get("GROOVIA_PRIME_KB", "256")) * 1024
+PRIME_BUFFER_BYTES = int(os.environ.get("GROOVIA_PRIME_BUFFER_MB", "32")) * 1024 * 1024
+PRIME_TTL = 600
+
+_primed: OrderedDict = OrderedDict()  # videoId → {"url", "body", "total", "content_type", "stored_at"} (event loop only)
+_primed_size = 0
+
+PRIME_REQUESTS = metrics.Counter("groovia_prime_requests_total", "Primed-audio fetches and /stream lookups", ("result",))
+metrics.Gauge("groovia_prime_buffer_bytes", "Bytes held in the primed-audio buffer", fn=lambda: _primed_size)
+
+
+async def _prime(video_id: str, data) -> None:
+    url = data["url"]
+    entry = _primed.get(video_id)
+    if entry is not None and entry["url"] == url:
+        return
+    user_agent = data.get("http_headers", {}).get("User-Agent", "Mozilla/5.0")
+    try:
+        resp = await _get_upstream_client().get(url, headers={"User-Agent": user_agent, "Range": f"bytes=0-{PRIME_BYTES - 1}"})
+    except Exception as e:
+        PRIME_REQUESTS.inc("fetch_error")
+        logger.info(f"Priming {video_id} failed: {str(e)[:100]}")
+        return
+    total = resp.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+    if resp.status_code != 206 or not total.isdigit():
+        PRIME_REQUESTS.inc("fetch_error")
+        return
+    _store_primed(video_id, {
+        "url": url, "body": resp.content, "total": int(total),
+        "content_type": resp.headers.get("Content-Type", ""), "stored_at": time.monotonic(),
+    })
+    PRIME_REQUESTS.inc("stored")
+
+
+def _store_primed(video_id: str, entry: dict) -> None:
+    global _primed_size
+    old = _primed.pop(video_id, None)
+    if old is not None:
+        _primed_size -= len(old["body"])
+    _primed[video_id] = entry
+    _primed_size += len(entry["body"])
+    while _primed_size > PRIME_BUFFER_BYTES and _primed:
+        _, evicted = _primed.popitem(last=False)
+        _primed_size -= len(evicted["body"])
+        CACHE_EVICTIONS.inc("primed")
+
+
+def _take_primed(video_id: str, url: str, range_header: str):
+    """The primed entry for a /stream request, if it is fresh and the range starts at 0."""
+    global _primed_size
+    entry = _primed.get(video_id)
+    if entry is None:
+        return None
+    if entry["url"] != url or time.monotonic() - entry["stored_at"] > PRIME_TTL:
+        _primed.pop(video_id, None)
+        _primed_size -= len(entry["body"])
+        PRIME_REQUESTS.inc("stale")
+        CACHE_EVICTIONS.inc("primed")
+        return None
+    if not range_header.startswith("bytes=0-") or "," in range_header:
+        return None
+    end = range_header[len("bytes=0-"):]
+    if end and not end.isdigit():
+        return None
+    _primed.move_to_end(video_id)
+    PRIME_REQUESTS.inc("hit")
+    return entry
+
+
+def _close_unread(task: asyncio.Task) -> None:
+    """Done-callback for an upstream send whose reader went away."""
+    if not task.cancelled() and task.exception() is None:
+        _spawn(task.result().aclose())
+
+
+def _primed_response(video_id: str, entry: dict, range_header: str, req_headers: dict, content_type: str, trace):
+    """206 for bytes=0-[end]: primed bytes first, the remainder (if any) streamed from upstream."""
+    body, total = entry["body"], entry["total"]
+    requested_end = range_header[len("bytes=0-"):]
+    end = min(int(requested_end), total - 1) if requested_end else total - 1
+    head = body[:end + 1]
+    rest_range = f"bytes={len(head)}-{end}" if end >= len(head) else None
+
+    resp_headers = dict(_STREAM_HEADERS)
+    resp_headers["Content-Range"] = f"bytes 0-{end}/{total}"
+    resp_headers["Content-Length"] = str(end + 1)
+    resp_headers["Content-Type"] = entry["content_type"] if entry["content_type"].startswith("audio") else content_type
+
+    async def primed_stream():
+        PROXY_ACTIVE.inc("stream")
+        client = _get_upstream_client()
+        rest_task = rest = None
+        if rest_range:
+            request = client.build_request("GET", entry["url"], headers={**req_headers, "Range": rest_range})
+            rest_task = _spawn(client.send(request, stream=True))
+        try:
+            trace.finish(status=206, primed=True)
+            PROXY_BYTES.inc("stream", amount=len(head))
+            yield head
+            if rest_task is None:
+                return
+            rest = await rest_task
+            UPSTREAM_STATUS.inc("stream", rest.status_code)
+            if rest.status_code != 206:
+                logger.warning(f"⚠️ Primed stream {video_id}: upstream answered {rest.status_code} for {rest_range}")
+                return
+            async for chunk in rest.aiter_bytes(chunk_size=65536):
+                PROXY_BYTES.inc("stream", amount=len(chunk))
+                yield chunk
+        except httpx.HTTPError as e:
+            logger.warning(f"⚠️ Primed stream {video_id}: upstream continuation failed: {str(e)[:100]}")
+        finally:
+            PROXY_ACTIVE.dec("stream")
+            if rest is not None:
+                await rest.aclose()
+            elif rest_task is not None:
+                # Abandoned before the continuation was read: close it if it still arrives
+                rest_task.add_done_callback(_close_unread)
+                rest_task.cancel()
+
+    logger.info(f"⚡ Streaming {video_id} from primed bytes ({len(head)} B) range={range_header}")
+    return StreamingResponse(primed_stream(), status_code=206, media_type=resp_headers["Content-Type"], headers=resp_headers)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Parallel Range download engine
+# googlevideo throttles each connection to ~playback rate, so a known-length
+# file is split into ranges fetched concurrently over one pooled client and
+# yielded in order. At most DOWNLOAD_CONNECTIONS chunks are held in memory.
+# ─────────────────────────────────────────────────────────────────────────────
+DOWNLOAD_CHUNK = 1024 * 1024
+DOWNLOAD_CONNECTIONS = 6
+DOWNLOAD_RETRIES = 3
+
+UPSTREAM_KEEPALIVE = 60  # seconds an idle googlevideo connection stays pooled
+
+_upstream_client = None
+
+
+def _get_upstream_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for googlevideo fetches (/stream, /download, pre-connects)."""
+    global _upstream_client
+    if _upstream_client is None:
+        _upstream_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60, connect=10),
+            # Unbounded total: every open /stream holds a connection for its whole body
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=100,
+                                keepalive_expiry=UPSTREAM_KEEPALIVE),
+            follow_redirects=True,
+        )
+    return _upstream_client
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Upstream pre-connect
+# A resolved URL names the exact rN---sn-*.googlevideo.com host /stream will
+# hit, so /prefetch opens a pooled connection to it (DNS + TCP + TLS) with a
+# 1-byte Range probe, and the listener's first Range request reuses it. Each
+# host is warmed at most once per keep-alive window.
+# ─────────────────────────────────────────────────────────────────────────────
+PRECONNECTS = metrics.Counter("groovia_upstream_preconnects_total", "Connections pre-opened to googlevideo hosts", ("result",))
+_WARMED_HOSTS_MAX = 1000
+
+_warmed_hosts: OrderedDict = OrderedDict()  # host → monotonic time of the last warm-up (event loop only)
+
+
+def _preconnect(data) -> None:
+    """Background task: warm a pooled connection to the host serving this stream."""
+    url = data["url"]
+    host = urllib.parse.urlsplit(url).hostname
+    now = time.monotonic()
+    if not host or now - _warmed_hosts.get(host, -UPSTREAM_KEEPALIVE) < UPSTREAM_KEEPALIVE:
+        return
+    _warmed_hosts[host] = now
+    _warmed_hosts.move_to_end(host)
+    while len(_warmed_hosts) > _WARMED_HOSTS_MAX:
+        _warmed_hosts.popitem(last=False)
+    user_agent = data.get("http_headers", {}).get("User-Agent", "Mozilla/5.0")
+    _spawn(_warm_connection(host, url, user_agent))
+
+
+async def _warm_connection(host: str, url: str, user_agent: str) -> None:
+    try:
+        resp = await _get_upstream_client().get(url, headers={"User-Agent": user_agent, "Range": "bytes=0-0"})
+        PRECONNECTS.inc("ok" if resp.status_code in (200, 206) else "http_error")
+    except Exception as e:
+        _warmed_hosts.pop(host, None)
+        PRECONNECTS.inc("error")
+        logger.info(f"Pre-connect to {host} failed: {str(e)[:100]}")
+
+
+async def _content_length(url: str, headers: dict):
+    """Total size of a googlevideo resource: `clen` from the URL, else a 1-byte Range probe."""
+    clen = urllib.parse.parse_qs(urllib.parse.urlparse(url).query).get("clen")
+    if clen and clen[0].isdigit():
+        return int(clen[0])
+    try:
+        resp = await _get_upstream_client().get(url, headers={**headers, "Range": "bytes=0-0"})
+        content_range = resp.headers.get("Content-Range", "")
+        if "/" in content_range and content_range.rsplit("/", 1)[1].isdigit():
+            return int(content_range.rsplit("/", 1)[1])
+    except Exception as e:
+        logger.warning(f"Content-Length probe failed: {e}")
+    return None
+
+
+async def _fetch_range(url: str, headers: dict, start: int, end: int) -> bytes:
+    client = _get_upstream_client()
+    last_error = None
+    for attempt in range(DOWNLOAD_RETRIES):
+        try:
+            resp = await client.get(url, headers={**headers, "Range": f"bytes={start}-{end}"})
+            UPSTREAM_STATUS.inc("download", resp.status_code)
+            if resp.status_code in (200, 206) and len(resp.content) == end - start + 1:
+                return resp.content
+            last_error = f"HTTP {resp.status_code}, {len(resp.content)} bytes"
+        except httpx.HTTPError as e:
+            last_error = e
+        await asyncio.sleep(0.2 * (attempt + 1))
+    raise IOError(f"Range {start}-{end} failed: {last_error}")
+
+
+async def _parallel_download(url: str, headers: dict, total: int):
+    window: deque = deque()
+    next_start = 0
+    PROXY_ACTIVE.inc("download")
+    try:
+        while next_start < total or window:
+            while next_start < total and len(window) < DOWNLOAD_CONNECTIONS:
+                end = min(next_start + DOWNLOAD_CHUNK, total) - 1
+                window.append(asyncio.ensure_future(_fetch_range(url, headers, next_start, end)))
+                next_start = end + 1
+            chunk = await window.popleft()
+            PROXY_BYTES.inc("download", amount=len(chunk))
+            yield chunk
+    finally:
+        PROXY_ACTIVE.dec("download")
+        for task in window:
+            task.cancel()
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # /download — One-click download
 # ─────────────────────────────────────────────────────────────────────────────
@@ -472,8 +1272,7 @@ async def download_audio(
     One-click audio download. Streams back to client without HTTP redirects.
     """
     try:
-        loop = asyncio.get_event_loop()
-        data = await loop.run_in_executor(executor, _extract_stream_url, videoId)
+        data = await _resolve_stream(videoId, "stream")
         url = data["url"]
         http_headers = data.get("http_headers", {})
         ext = data.get("ext", "webm")
@@ -488,32 +1287,43 @@ async def download_audio(
 
         safe_title = "".join(c for c in title if c.isalnum() or c in " -_").strip()
         filename = f"{safe_title or 'song'}.{ext}"
+        req_headers = {
+            "User-Agent": http_headers.get(
+                "User-Agent",
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0 Safari/537.36",
+            )
+        }
+        resp_headers = {
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Expose-Headers": "Content-Disposition",
+        }
+
+        total = await _content_length(url, req_headers)
 
         async def download_stream():
-            async with httpx.AsyncClient(timeout=60) as client:
-                async with client.stream(
-                    "GET",
-                    url,
-                    headers={
-                        "User-Agent": http_headers.get(
-                            "User-Agent",
-                            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0 Safari/537.36",
-                        )
-                    },
-                    follow_redirects=True,
-                ) as resp:
+            # Unknown length — single sequential connection
+            PROXY_ACTIVE.inc("download")
+            try:
+                async with _get_upstream_client().stream("GET", url, headers=req_headers) as resp:
+                    UPSTREAM_STATUS.inc("download", resp.status_code)
                     async for chunk in resp.aiter_bytes(chunk_size=65536):
+                        PROXY_BYTES.inc("download", amount=len(chunk))
                         yield chunk
+            finally:
+                PROXY_ACTIVE.dec("download")
+
+        if total:
+            body = _parallel_download(url, req_headers, total)
+            resp_headers["Content-Length"] = str(total)
+        else:
+            body = download_stream()
 
-        logger.info(f"⬇️ Download: {filename}")
+        logger.info(f"⬇️ Download: {filename} ({total or '?'} bytes, {'parallel' if total else 'sequential'})")
         return StreamingResponse(
-            download_stream(),
+            body,
             media_type=content_type,
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Expose-Headers": "Content-Disposition",
-            },
+            headers=resp_headers,
         )
 
     except HTTPException:
@@ -523,23 +1333,133 @@ async def download_audio(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Playlist paging — first page straight away, continuations fetched on demand
+# ─────────────────────────────────────────────────────────────────────────────
+PLAYLIST_PAGE_TTL = 1800
+
+
+def _fetch_playlist_first_page(browseId: str) -> dict:
+    """
+    Fetch playlist metadata plus the first upstream page of tracks (~100) in a
+    single browse request. limit=0 stops ytmusicapi from following continuations.
+    """
+    from ytmusicapi.continuations import get_continuation_token
+    from ytmusicapi.navigation import CONTENT, SECTION, TWO_COLUMN_RENDERER, nav
+
+    yt._local.responses = []
+    try:
+        playlist = yt.get_playlist(playlistId=browseId, limit=0)
+        first_response = yt._local.responses[0] if yt._local.responses else {}
+    finally:
+        yt._local.responses = None
+
+    shelf = nav(
+        first_response,
+        [*TWO_COLUMN_RENDERER, "secondaryContents", *SECTION, *CONTENT, "musicPlaylistShelfRenderer"],
+        True,
+    ) or {}
+    contents = shelf.get("contents") or []
+    playlist["continuation"] = get_continuation_token(contents) if contents else None
+    return playlist
+
+
+def _fetch_playlist_continuation(token: str) -> dict:
+    """Fetch one continuation page of playlist tracks."""
+    from ytmusicapi.continuations import CONTINUATION_ITEMS, get_continuation_token
+    from ytmusicapi.navigation import nav
+    from ytmusicapi.parsers.playlists import parse_playlist_items
+
+    response = yt._send_request("browse", {"continuation": token})
+    items = nav(response, CONTINUATION_ITEMS, True) or []
+    return {
+        "tracks": parse_playlist_items(items) if items else [],
+        "continuation": get_continuation_token(items) if items else None,
+    }
+
+
+async def _get_playlist_page(browseId: str, continuation: str = None) -> dict:
+    """Return one cached playlist page, fetching it at most once at a time."""
+    cache_key = f"playlist:{browseId}:page:{continuation or 0}"
+    cached = await _cache_io(cache_get, cache_key)
+    if cached is not None:
+        return cached
+
+    if continuation:
+        page = await _run_once(cache_key, _fetch_playlist_continuation, continuation)
+    else:
+        page = await _run_once(cache_key, _fetch_playlist_first_page, browseId)
+    await _cache_io(cache_set, cache_key, page, PLAYLIST_PAGE_TTL)
+    _index_later(page.get("tracks") or [])
+    return page
+
+
+async def _stream_playlist(browseId: str, limit: int = None):
+    """
+    NDJSON generator: one metadata line, then one line per track as each
+    continuation page arrives, then an end marker.
+    """
+    sent = 0
+    try:
+        page = await _get_playlist_page(browseId)
+        meta = {k: v for k, v in page.items() if k not in ("tracks", "continuation")}
+        yield json.dumps({"type": "playlist", "data": meta}) + "\n"
+        while True:
+            for track in page.get("tracks") or []:
+                if limit is not None and sent >= limit:
+                    break
+                yield json.dumps({"type": "track", "data": track}) + "\n"
+                sent += 1
+            token = page.get("continuation")
+            if not token or (limit is not None and sent >= limit):
+                break
+            page = await _get_playlist_page(browseId, token)
+        yield json.dumps({"type": "end", "count": sent}) + "\n"
+    except Exception as e:
+        logger.warning(f"Playlist stream failed for {browseId}: {e}")
+        yield json.dumps({"type": "error", "detail": str(e), "count": sent}) + "\n"
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # /playlist
+#   ?paged=true            → first page + continuation token
+#   ?continuation=<token>  → next page + continuation token
+#   ?stream=true           → NDJSON, tracks yielded as continuations arrive
 # ─────────────────────────────────────────────────────────────────────────────
 @app.get("/playlist")
-async def get_playlist(browseId: str, limit: int = 100):
+async def get_playlist(
+    browseId: str,
+    limit: int = 100,
+    continuation: str = None,
+    paged: bool = False,
+    stream: bool = False,
+):
+    if stream:
+        return StreamingResponse(
+            _stream_playlist(browseId, limit if limit > 0 else None),
+            media_type="application/x-ndjson",
+        )
+
+    if paged or continuation:
+        try:
+            page = await _get_playlist_page(browseId, continuation)
+            return {"data": page, "continuation": page.get("continuation")}
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
     cache_key = f"playlist:{browseId}:{limit}"
-    cached = cache_get(cache_key)
+    cached = await _cache_io(cache_get, cache_key)
     if cached is not None:
         return {"data": cached, "cached": True}
     try:
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(
-            executor,
-            lambda: yt.get_playlist(playlistId=browseId, limit=limit)
-        )
-        cache_set(cache_key, results, ttl=1800)
+        results = await _offload("metadata", lambda: yt.get_playlist(playlistId=browseId, limit=limit))
+        await _cache_io(cache_set, cache_key, results, 1800)
+        _index_later(results.get("tracks") or [])
         return {"data": results}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -547,19 +1467,96 @@ async def get_playlist(browseId: str, limit: int = 100):
 # ─────────────────────────────────────────────────────────────────────────────
 # /lyrics
 # ─────────────────────────────────────────────────────────────────────────────
+# Backed by the persistent lyrics_store; "no lyrics" and upstream errors are
+# negatively cached so they are not retried on every request.
+# ─────────────────────────────────────────────────────────────────────────────
+LYRICS_PREFETCH_MAX = 50
+LYRICS_QUEUE_MAX = 200
+LYRICS_WARMERS = 2
+LYRICS_WARM_ATTEMPTS = 3
+
+LYRICS_WARMUPS = metrics.Counter("groovia_lyrics_warmups_total", "Background lyrics warm-ups", ("result",))
+_lyrics_queue: asyncio.Queue = None  # created with its workers on first use (needs the running loop)
+metrics.Gauge("groovia_lyrics_queue_depth", "Lyrics warm-ups waiting for a worker",
+              fn=lambda: _lyrics_queue.qsize() if _lyrics_queue else 0)
+
+
+def _fetch_lyrics(browseId: str):
+    """Store-first lyrics lookup; only goes upstream on a store miss. Never raises."""
+    hit, data = lyrics_store.get(browseId)
+    if hit:
+        return data
+    try:
+        data = yt.get_lyrics(browseId=browseId)
+    except Exception as e:
+        logger.warning(f"Lyrics fetch failed for {browseId}: {e}")
+        lyrics_store.put_error(browseId)
+        return None
+    lyrics_store.put(browseId, data)
+    return data
+
+
+async def _warm_lyrics(browseId: str) -> str:
+    for attempt in range(LYRICS_WARM_ATTEMPTS):
+        try:
+            await _run_once(f"lyrics:{browseId}", _fetch_lyrics, browseId, kind="prefetch")
+            return "done"
+        except HTTPException as e:
+            # Saturated: back off like any client would, then give up (/lyrics fetches on demand)
+            await asyncio.sleep(int((e.headers or {}).get("Retry-After", RETRY_AFTER)))
+    logger.warning(f"🎤 Lyrics warm-up shed after {LYRICS_WARM_ATTEMPTS} attempts: {browseId}")
+    return "shed"
+
+
+async def _lyrics_worker():
+    # Warm-ups belong to no client: they must not use up the caller's CLIENT_MAX_INFLIGHT slots
+    _client_ctx.set(None)
+    while True:
+        browseId = await _lyrics_queue.get()
+        try:
+            LYRICS_WARMUPS.inc(await _warm_lyrics(browseId))
+        except Exception as e:
+            logger.warning(f"🎤 Lyrics warm-up failed for {browseId}: {e}")
+            LYRICS_WARMUPS.inc("error")
+
+
+def _prefetch_lyrics(browseId: str) -> bool:
+    """Queue a lyrics warm-up so opening the lyrics pane never waits; False if the queue is full."""
+    global _lyrics_queue
+    if _lyrics_queue is None:
+        _lyrics_queue = asyncio.Queue(maxsize=LYRICS_QUEUE_MAX)
+        for _ in range(LYRICS_WARMERS):
+            _spawn(_lyrics_worker())
+    try:
+        _lyrics_queue.put_nowait(browseId)
+        return True
+    except asyncio.QueueFull:
+        LYRICS_WARMUPS.inc("dropped")
+        return False
+
+
 @app.get("/lyrics")
 async def get_lyrics(browseId: str):
     cache_key = f"lyrics:{browseId}"
-    cached = cache_get(cache_key)
+    cached = await _cache_io(cache_get, cache_key)
     if cached is not None:
         return {"data": cached, "cached": True}
-    try:
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(executor, lambda: yt.get_lyrics(browseId=browseId))
-        cache_set(cache_key, results, ttl=86400)
-        return {"data": results}
-    except Exception as e:
-        return {"data": None}
+
+    # sqlite read: off the event loop, but not behind admission control like the upstream fetch
+    hit, data = await run_in_threadpool(lyrics_store.get, browseId)
+    if not hit:
+        data = await _run_once(cache_key, _fetch_lyrics, browseId)
+    if data is not None:
+        await _cache_io(cache_set, cache_key, data, 86400)
+    return {"data": data, "cached": True} if hit else {"data": data}
+
+
+@app.get("/lyrics/prefetch")
+async def prefetch_lyrics(browseIds: str):
+    """Bulk warm-up: comma-separated lyrics browseIds (MPLYt...)."""
+    ids = [b for b in dict.fromkeys(browseIds.split(",")) if b.strip()][:LYRICS_PREFETCH_MAX]
+    queued = sum(_prefetch_lyrics(browseId.strip()) for browseId in ids)
+    return {"status": "queued", "count": queued, "dropped": len(ids) - queued}
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -568,15 +1565,14 @@ async def get_lyrics(browseId: str):
 @app.get("/artist")
 async def get_artist_data(channelId: str):
     cache_key = f"artist:{channelId}"
-    cached = cache_get(cache_key)
+    cached = await _cache_io(cache_get, cache_key)
     if cached is not None:
         return {"data": cached, "cached": True}
     try:
-        loop = asyncio.get_event_loop()
-        artist = await loop.run_in_executor(executor, lambda: yt.get_artist(channelId))
+        artist = await _offload("metadata", lambda: yt.get_artist(channelId))
         if not artist:
             raise HTTPException(status_code=404, detail="Artist not found")
-        cache_set(cache_key, artist, ttl=3600)
+        await _cache_io(cache_set, cache_key, artist, 3600)
         return {"data": artist}
     except HTTPException:
         raise
@@ -590,37 +1586,41 @@ async def get_artist_data(channelId: str):
 @app.get("/charts")
 async def get_charts_data(country: str = "IN"):
     cache_key = f"charts:{country}"
-    cached = cache_get(cache_key)
+    cached = await _cache_io(cache_get, cache_key)
     if cached is not None:
         return {"data": cached, "cached": True}
     try:
-        loop = asyncio.get_event_loop()
-        charts = await loop.run_in_executor(executor, lambda: yt.get_charts(country=country))
+        charts = await _offload("metadata", lambda: yt.get_charts(country=country))
 
         songs = []
         if charts.get("videos"):
             playlist_id = charts["videos"][0].get("playlistId")
             if playlist_id:
-                playlist = await loop.run_in_executor(
-                    executor,
-                    lambda: yt.get_playlist(playlistId=playlist_id, limit=30)
-                )
+                playlist = await _offload("metadata", lambda: yt.get_playlist(playlistId=playlist_id, limit=30))
                 tracks = playlist.get("tracks", []) or []
                 songs = [t for t in tracks if t.get("videoId")]
 
         if not songs:
-            fallback = await loop.run_in_executor(
-                executor,
-                lambda: yt.search("India Top Songs Hindi 2025", filter="songs", limit=20)
-            )
+            fallback = await _offload("metadata", lambda: yt.search("India Top Songs Hindi 2025", filter="songs", limit=20))
             songs = [s for s in (fallback or []) if s.get("videoId")]
 
         result = {"charts": charts, "songs": songs}
-        cache_set(cache_key, result, ttl=3600)
+        await _cache_io(cache_set, cache_key, result, 3600)
+        _index_later(result)
         return {"data": result}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8005)
+    import uvicorn
+
+    # GROOVIA_WORKERS > 1 runs several processes; pair it with a shared
+    # GROOVIA_CACHE_BACKEND (sqlite/redis) so workers don't duplicate extractions.
+    workers = int(os.environ.get("GROOVIA_WORKERS", "1"))
+    if workers > 1:
+        uvicorn.run("server:app", host="0.0.0.0", port=8005, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8005)
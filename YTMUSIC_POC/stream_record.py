@@ -0,0 +1,66 @@
+"""
+Compact stream cache records for the in-process (memory) cache backend.
+
+A cached stream used to be a five-key dict plus its own http_headers dict. A
+StreamRecord is a slotted object instead: the signed URL is kept as bytes, the
+ext is interned, and identical header sets are stored once and shared
+read-only between records. It answers the same ["url"] / .get(...) lookups as
+the dict, so callers don't care which one they hold. Shared backends
+(sqlite/redis) keep storing plain dicts, since they serialize to JSON anyway.
+"""
+
+import sys
+import threading
+from types import MappingProxyType
+
+_header_sets: dict = {}  # sorted header items → shared read-only mapping
+_header_lock = threading.Lock()
+
+
+def intern_headers(headers) -> MappingProxyType:
+    key = tuple(sorted((headers or {}).items()))
+    shared = _header_sets.get(key)
+    if shared is None:
+        with _header_lock:
+            shared = _header_sets.setdefault(key, MappingProxyType(dict(key)))
+    return shared
+
+
+def shared_header_sets() -> int:
+    return len(_header_sets)
+
+
+class StreamRecord:
+    __slots__ = ("_url", "ext", "http_headers", "title", "expires_at")
+
+    def __init__(self, url: str, ext: str, http_headers, title: str, expires_at: float):
+        self._url = url.encode()
+        self.ext = sys.intern(ext)
+        self.http_headers = intern_headers(http_headers)
+        self.title = title
+        self.expires_at = expires_at
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StreamRecord":
+        return cls(data["url"], data.get("ext", "webm"), data.get("http_headers"),
+                   data.get("title", ""), data.get("expires_at", 0))
+
+    @property
+    def url(self) -> str:
+        return self._url.decode()
+
+    def __getitem__(self, key: str):
+        if key not in _FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in _FIELDS else default
+
+    def to_dict(self) -> dict:
+        data = {k: getattr(self, k) for k in _FIELDS}
+        data["http_headers"] = dict(self.http_headers)
+        return data
+
+
+_FIELDS = ("url", "ext", "http_headers", "title", "expires_at")
@@ -0,0 +1,186 @@
+"""
+Lightweight per-request tracing, no dependencies.
+
+A trace is started per request (tracing.start) and carried in a contextvar, so
+code running on the executor can open spans with tracing.span("name") without
+passing anything around. Finished traces slower than GROOVIA_TRACE_SLOW_MS, plus
+a GROOVIA_TRACE_SAMPLE fraction of all traces, are kept in memory for
+/debug/traces and appended to GROOVIA_TRACE_FILE (JSON lines) when set.
+Span fields follow OTLP naming; with GROOVIA_TRACE_OTEL=1 and the
+opentelemetry SDK installed, kept traces are also re-emitted as OTel spans.
+Spans opened inside extraction worker processes are not collected.
+"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+SLOW_MS = float(os.environ.get("GROOVIA_TRACE_SLOW_MS", "2000"))
+SAMPLE_RATE = float(os.environ.get("GROOVIA_TRACE_SAMPLE", "0"))
+KEEP = int(os.environ.get("GROOVIA_TRACE_KEEP", "100"))
+_FILE = os.environ.get("GROOVIA_TRACE_FILE")
+
+_current: contextvars.ContextVar = contextvars.ContextVar("groovia_trace", default=None)
+_stack: contextvars.ContextVar = contextvars.ContextVar("groovia_span_stack", default=())
+_kept: deque = deque(maxlen=KEEP)
+_file_lock = threading.Lock()
+_otel_tracer = None
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+class Trace:
+    def __init__(self, name: str, **attrs):
+        self.trace_id = _new_id(128)
+        self.root_id = _new_id(64)
+        self.name = name
+        self.attrs = attrs
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.spans: list = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start_ns: int, end_ns: int, parent: str = None, span_id: str = None, **attrs) -> None:
+        """Record a span with explicit timestamps (for work not wrapped in span())."""
+        with self._lock:
+            self.spans.append({
+                "span_id": span_id or _new_id(64),
+                "parent_span_id": parent or self.root_id,
+                "name": name,
+                "start_time_unix_nano": start_ns,
+                "end_time_unix_nano": end_ns,
+                "attributes": attrs,
+            })
+
+    def finish(self, **attrs) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        self.attrs.update(attrs)
+        duration_ms = (self.end_ns - self.start_ns) / 1e6
+        if duration_ms >= SLOW_MS or random.random() < SAMPLE_RATE:
+            _keep(self)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start_time_unix_nano"])
+        root = {
+            "span_id": self.root_id,
+            "parent_span_id": None,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "attributes": self.attrs,
+        }
+        return {
+            "trace_id": self.trace_id,
+            "duration_ms": round(((self.end_ns or time.time_ns()) - self.start_ns) / 1e6, 1),
+            "spans": [root] + spans,
+        }
+
+
+def start(name: str, **attrs) -> Trace:
+    """Begin a trace and make it current for this task (and executor jobs it submits)."""
+    trace = Trace(name, **attrs)
+    _current.set(trace)
+    _stack.set(())
+    return trace
+
+
+def current():
+    return _current.get()
+
+
+@contextlib.contextmanager
+def span(name: str, **attrs):
+    """Time a block as a span of the current trace; a no-op when nothing is traced."""
+    trace = _current.get()
+    if trace is None:
+        yield attrs
+        return
+    stack = _stack.get()
+    span_id = _new_id(64)
+    token = _stack.set(stack + (span_id,))
+    start_ns = time.time_ns()
+    try:
+        yield attrs
+    except Exception as e:
+        attrs["error"] = str(e)[:200]
+        raise
+    finally:
+        _stack.reset(token)
+        parent = stack[-1] if stack else None
+        trace.add(name, start_ns, time.time_ns(), parent=parent, span_id=span_id, **attrs)
+
+
+def record(name: str, start_ns: int, end_ns: int, **attrs) -> None:
+    """Add an already-timed span under the current span, if a trace is active."""
+    trace = _current.get()
+    if trace is not None:
+        stack = _stack.get()
+        trace.add(name, start_ns, end_ns, parent=stack[-1] if stack else None, **attrs)
+
+
+def recent(limit: int = 20) -> list:
+    return [t.to_dict() for t in list(_kept)[-limit:]][::-1]
+
+
+def _keep(trace: Trace) -> None:
+    _kept.append(trace)
+    if _FILE:
+        try:
+            with _file_lock, open(_FILE, "a", encoding="utf-8") as f:
+                f.write(json.dumps(trace.to_dict(), separators=(",", ":"), default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"Trace sink write failed: {e}")
+    if _otel_tracer is not None:
+        _export_otel(trace)
+
+
+def _export_otel(trace: Trace) -> None:
+    from opentelemetry import trace as otel_trace
+
+    try:
+        data = trace.to_dict()
+        root, children = data["spans"][0], data["spans"][1:]
+        otel_spans = {}
+        root_span = _otel_tracer.start_span(root["name"], start_time=root["start_time_unix_nano"], attributes=_otel_attrs(root))
+        otel_spans[root["span_id"]] = root_span
+        for s in children:
+            parent = otel_spans.get(s["parent_span_id"], root_span)
+            child = _otel_tracer.start_span(
+                s["name"],
+                context=otel_trace.set_span_in_context(parent),
+                start_time=s["start_time_unix_nano"],
+                attributes=_otel_attrs(s),
+            )
+            otel_spans[s["span_id"]] = child
+        for s in reversed(children):
+            otel_spans[s["span_id"]].end(end_time=s["end_time_unix_nano"])
+        root_span.end(end_time=root["end_time_unix_nano"])
+    except Exception as e:
+        logger.warning(f"OpenTelemetry export failed: {e}")
+
+
+def _otel_attrs(s: dict) -> dict:
+    return {k: v if isinstance(v, (str, bool, int, float)) else str(v) for k, v in s["attributes"].items()}
+
+
+if os.environ.get("GROOVIA_TRACE_OTEL") == "1":
+    try:
+        from opentelemetry import trace as _otel
+
+        _otel_tracer = _otel.get_tracer("groovia")
+        logger.info("🔭 Tracing: exporting kept traces to OpenTelemetry")
+    except ImportError:
+        logger.warning("GROOVIA_TRACE_OTEL=1 but opentelemetry is not installed — using the local sink only")
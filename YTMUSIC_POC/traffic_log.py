@@ -0,0 +1,109 @@
+"""
+Sampled, anonymized request log for replaying production traffic (see replay.py).
+
+Enabled with GROOVIA_TRAFFIC_LOG=<path.jsonl>; GROOVIA_TRAFFIC_SAMPLE is the
+fraction of clients recorded (default 1.0). Sampling is per client, so a
+sampled listener's whole session — /watch, the /prefetch burst, every Range
+seek — lands in the log together.
+
+One JSON line per request: arrival time, method, path, query params, Range,
+status, time to first byte, total time and body bytes sent. Client addresses
+and free-text params (search queries, titles) are replaced by salted hashes:
+repeats stay repeats, so cache behaviour survives, but the text does not.
+Set GROOVIA_TRAFFIC_SALT to keep hashes stable across restarts.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from urllib.parse import parse_qsl
+
+logger = logging.getLogger(__name__)
+
+FREE_TEXT_PARAMS = {"query", "q", "title"}
+SKIP_PATHS = {"/", "/metrics", "/debug/traces"}
+
+
+class TrafficRecorder:
+    """Pure ASGI middleware, so streamed bodies pass through untouched."""
+
+    def __init__(self, app, path: str, sample: float = 1.0, salt: str = None):
+        self.app = app
+        self.sample = sample
+        self._salt = (salt or secrets.token_hex(16)).encode()
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+        logger.info(f"📼 Recording {sample:.0%} of clients to {path}")
+
+    def _hash(self, value: str) -> str:
+        return hmac.new(self._salt, value.encode(), hashlib.sha256).hexdigest()[:12]
+
+    def _client(self, scope) -> str:
+        headers = dict(scope.get("headers") or [])
+        forwarded = headers.get(b"x-forwarded-for", b"").decode().split(",")[0].strip()
+        host = forwarded or (scope.get("client") or ("?",))[0]
+        return self._hash(host)
+
+    def _sampled(self, client: str) -> bool:
+        return int(client[:8], 16) / 0xFFFFFFFF < self.sample
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in SKIP_PATHS:
+            return await self.app(scope, receive, send)
+        client = self._client(scope)
+        if not self._sampled(client):
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        entry = {
+            "t": round(time.time(), 3),
+            "client": client,
+            "method": scope["method"],
+            "path": scope["path"],
+            "params": {
+                k: (f"anon-{self._hash(v)}" if k in FREE_TEXT_PARAMS else v)
+                for k, v in parse_qsl(scope.get("query_string", b"").decode())
+            },
+            "range": dict(scope.get("headers") or []).get(b"range", b"").decode() or None,
+            "status": None,
+            "ttfb_ms": None,
+            "bytes": 0,
+        }
+
+        async def recording_send(message):
+            if message["type"] == "http.response.start":
+                entry["status"] = message["status"]
+                entry["ttfb_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            elif message["type"] == "http.response.body":
+                entry["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, recording_send)
+        finally:
+            entry["ms"] = round((time.perf_counter() - start) * 1000, 1)
+            self._write(entry)
+
+    def _write(self, entry: dict) -> None:
+        try:
+            with self._lock:
+                self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Traffic log write failed: {e}")
+
+
+def install(app) -> None:
+    """Attach the recorder when GROOVIA_TRAFFIC_LOG is set."""
+    path = os.environ.get("GROOVIA_TRAFFIC_LOG")
+    if path:
+        app.add_middleware(
+            TrafficRecorder,
+            path=path,
+            sample=float(os.environ.get("GROOVIA_TRAFFIC_SAMPLE", "1.0")),
+            salt=os.environ.get("GROOVIA_TRAFFIC_SALT"),
+        )